@@ -6,6 +6,8 @@
     'summary': 'Loyalty and Customer Engagement',
     'description': 'A customized loyalty system for your store: Promote your new products with ease by motivating your customers with rewards and customized offers, then retarget them with multiple marketing tools and make your decisions based on detailed reports.',
     'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/res_config_settings_view.xml'
     ],
     'depends': ['point_of_sale', 'pos_discount'],
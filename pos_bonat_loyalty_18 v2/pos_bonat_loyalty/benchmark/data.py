@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Synthetic POS data for the benchmarks.
+
+Every generated record is named with the ``BENCH`` prefix, and the data
+only depends on the counts and the seed, so two databases generated with
+the same arguments hold the same catalog and order history.
+"""
+import base64
+import io
+import random
+from datetime import timedelta
+
+from odoo import fields
+
+PREFIX = 'BENCH'
+
+
+def _make_image(rng, size=512):
+    from PIL import Image
+    image = Image.new('RGB', (size, size), tuple(rng.randrange(256) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue())
+
+
+def is_generated(env):
+    return bool(env['pos.config'].search_count([('name', '=like', PREFIX + ' %')], limit=1))
+
+
+def generate(env, seed=0, products=1000, categories=20, tags=10, taxes=3, images=100,
+             partners=200, configs=3, sessions=10, orders=5000, lines_per_order=4, batch_size=500):
+    """Create the benchmark data in ``env`` and return the ids created, by model.
+
+    ``sessions`` and ``orders`` are per point of sale. Sessions are created
+    closed, except the last one of each point of sale, and orders are
+    spread over one day per session.
+    """
+    rng = random.Random(seed)
+    created = {}
+
+    tax_ids = env['account.tax'].create([{
+        'name': '%s Tax %d%%' % (PREFIX, 5 * (i + 1)),
+        'amount': 5 * (i + 1),
+        'amount_type': 'percent',
+        'type_tax_use': 'sale',
+    } for i in range(taxes)]).ids
+    tag_ids = env['product.tag'].create([{'name': '%s Tag %d' % (PREFIX, i)} for i in range(tags)]).ids
+    category_ids = []
+    for i in range(categories):
+        category_ids += env['pos.category'].create({
+            'name': '%s Category %d' % (PREFIX, i),
+            'parent_id': rng.choice(category_ids) if category_ids and rng.random() < 0.3 else False,
+            'sequence': i,
+        }).ids
+    created.update({'account.tax': tax_ids, 'product.tag': tag_ids, 'pos.category': category_ids})
+
+    product_ids = []
+    for start in range(0, products, batch_size):
+        vals_list = []
+        for i in range(start, min(start + batch_size, products)):
+            vals = {
+                'name': '%s Product %d' % (PREFIX, i),
+                'default_code': '%s-%05d' % (PREFIX, i),
+                'list_price': round(rng.uniform(1, 100), 2),
+                'available_in_pos': True,
+                'taxes_id': [(6, 0, rng.sample(tax_ids, k=min(len(tax_ids), rng.randint(0, 2))))],
+                'product_tag_ids': [(6, 0, rng.sample(tag_ids, k=min(len(tag_ids), rng.randint(0, 3))))],
+                'pos_categ_ids': [(6, 0, rng.sample(category_ids, k=min(len(category_ids), rng.randint(1, 2))))],
+            }
+            if i < images:
+                vals['image_1920'] = _make_image(rng)
+            vals_list.append(vals)
+        product_ids += env['product.product'].create(vals_list).ids
+        env.invalidate_all()
+    created['product.product'] = product_ids
+
+    partner_ids = env['res.partner'].create([{
+        'name': '%s Customer %d' % (PREFIX, i),
+        'email': 'customer%d@bench.example.com' % i,
+        'phone': '+966500%06d' % i,
+    } for i in range(partners)]).ids
+    created['res.partner'] = partner_ids
+
+    products_by_id = {product.id: product for product in env['product.product'].browse(product_ids)}
+    created.update({'pos.config': [], 'pos.session': [], 'pos.order': []})
+    now = fields.Datetime.now()
+    for c in range(configs):
+        config = env['pos.config'].create({'name': '%s POS %d' % (PREFIX, c)})
+        payment_methods = config.payment_method_ids
+        created['pos.config'].append(config.id)
+        for s in range(sessions):
+            session = env['pos.session'].create({'config_id': config.id, 'user_id': env.uid})
+            day = now - timedelta(days=sessions - s)
+            session.write({'start_at': day})
+            created['pos.session'].append(session.id)
+            for start in range(0, orders, batch_size):
+                vals_list = []
+                for i in range(start, min(start + batch_size, orders)):
+                    lines = []
+                    amount_tax = amount_total = 0
+                    for product_id in rng.sample(product_ids, k=min(len(product_ids), rng.randint(1, 2 * lines_per_order - 1))):
+                        product = products_by_id[product_id]
+                        qty = rng.randint(1, 3)
+                        subtotal = product.list_price * qty
+                        tax = subtotal * sum(product.taxes_id.mapped('amount')) / 100
+                        lines.append((0, 0, {
+                            'product_id': product_id,
+                            'full_product_name': product.name,
+                            'qty': qty,
+                            'price_unit': product.list_price,
+                            'price_subtotal': subtotal,
+                            'price_subtotal_incl': subtotal + tax,
+                            'tax_ids': [(6, 0, product.taxes_id.ids)],
+                        }))
+                        amount_tax += tax
+                        amount_total += subtotal + tax
+                    vals = {
+                        'session_id': session.id,
+                        'partner_id': rng.choice(partner_ids) if partner_ids and rng.random() < 0.5 else False,
+                        'date_order': day + timedelta(seconds=rng.randrange(12 * 3600)),
+                        'lines': lines,
+                        'amount_tax': amount_tax,
+                        'amount_total': amount_total,
+                        'amount_paid': amount_total,
+                        'amount_return': 0,
+                        'state': 'paid',
+                    }
+                    if payment_methods:
+                        vals['payment_ids'] = [(0, 0, {
+                            'amount': amount_total,
+                            'payment_method_id': rng.choice(payment_methods.ids),
+                        })]
+                    vals_list.append(vals)
+                created['pos.order'] += env['pos.order'].create(vals_list).ids
+                env.invalidate_all()
+            if s < sessions - 1:
+                session.write({'state': 'closed', 'stop_at': day + timedelta(hours=12)})
+    return created
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the Bonat POS REST API and of the Bonat client paths.
+
+Runs offline against a throw-away database with ``pos_bonat_loyalty``
+installed: the synthetic data (see ``data``) is committed on the first
+run and reused afterwards, and the Bonat API is replaced by a local stub
+server (see ``stub_server``). Every option after ``--`` goes to Odoo::
+
+    python benchmark/run.py --output after.json --compare before.json -- -c odoo.conf -d bonat_bench
+
+Each ``/api/pos/*`` and ``/api/image`` scenario is served in process by
+the Odoo WSGI application and reports its latency, SQL queries and time,
+payload size and peak Python memory. The client paths (code checks,
+redemptions, order creations and their delivery) are load-tested with
+``--concurrency`` threads, then rolled back.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import odoo
+import odoo.http
+import odoo.service.server
+from odoo import SUPERUSER_ID, api, fields
+from odoo.tools import config
+
+SCOPE = 'odoo.restapi'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--configs', type=int, default=3)
+    parser.add_argument('--sessions', type=int, default=10, help="sessions per point of sale")
+    parser.add_argument('--orders', type=int, default=500, help="orders per session")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--client-calls', type=int, default=200, help="calls per client path")
+    parser.add_argument('--stub-latency', type=float, default=0.02, help="seconds")
+    parser.add_argument('--stub-error-rate', type=float, default=0)
+    parser.add_argument('--only', help="comma separated scenario name prefixes")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of a previous run to compare with")
+    if '--' in argv:
+        index = argv.index('--')
+        argv, odoo_argv = argv[:index], argv[index + 1:]
+    else:
+        odoo_argv = []
+    return parser.parse_args(argv), odoo_argv
+
+
+def summarize(durations, queries, query_times, sizes, peak):
+    durations = sorted(durations)
+    return {
+        'n': len(durations),
+        'median_ms': statistics.median(durations) * 1000,
+        'p95_ms': durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+        'queries': statistics.median(queries) if queries else None,
+        'sql_ms': statistics.median(query_times) * 1000 if query_times else None,
+        'bytes': statistics.median(sizes) if sizes else None,
+        'peak_kib': peak / 1024 if peak is not None else None,
+    }
+
+
+def get_api_key(registry):
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        admin = env.ref('base.user_admin')
+        return env['res.users.apikeys'].with_user(admin)._generate(
+            SCOPE, 'Bonat benchmark', fields.Datetime.now() + timedelta(days=1))
+
+
+def get_api_scenarios(registry):
+    """``(name, path, before)`` of the REST scenarios, ``before`` being
+    called before each iteration (e.g. to empty a cache)."""
+    from odoo.addons.pos_bonat_loyalty.controllers import main
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        product_ids = env['product.product'].search([('default_code', '=like', 'BENCH-%')], order='id').ids
+        image_id = env['product.product'].search([('default_code', '=like', 'BENCH-%'), ('image_1920', '!=', False)], limit=1).id
+        config_id = env['pos.config'].search([('name', '=like', 'BENCH %')], order='id', limit=1).id
+        last_order = env['pos.order'].search([('config_id', '=', config_id)], order='date_order desc', limit=1)
+        day = fields.Date.to_string(last_order.date_order or fields.Datetime.now())
+
+    def clear_response_cache():
+        main._response_cache.clear()
+
+    ids = ','.join(map(str, product_ids[:200]))
+    return [
+        ('products', '/api/pos/products', clear_response_cache),
+        ('products.cached', '/api/pos/products', None),
+        ('products.page', '/api/pos/products?limit=100', clear_response_cache),
+        ('products.stream', '/api/pos/products?stream=1', None),
+        ('products.fields', '/api/pos/products?fields=id,display_name,lst_price', clear_response_cache),
+        ('products.ids', '/api/pos/products?ids=%s' % ids, None),
+        ('categories', '/api/pos/categories', clear_response_cache),
+        ('configs', '/api/pos/configs', clear_response_cache),
+        ('sessions', '/api/pos/sessions', None),
+        ('orders.page', '/api/pos/orders?limit=100', None),
+        ('orders.day', '/api/pos/orders?config_id=%s&date_from=%sT00:00:00&date_to=%sT23:59:59' % (config_id, day, day), None),
+        ('orders.stream', '/api/pos/orders?stream=1', None),
+        ('orders.summary', '/api/pos/orders/summary', None),
+        ('image', '/api/image/product.product/%s/image_1920' % image_id, None),
+        ('image.128', '/api/image/product.product/%s/image_1920?size=128' % image_id, None),
+    ]
+
+
+def run_api_scenarios(args, registry, api_key, only):
+    from werkzeug.test import Client
+    from werkzeug.wrappers import Response
+    client = Client(odoo.http.root, Response)
+    headers = {'Authorization': 'Bearer %s' % api_key, 'Accept-Encoding': 'gzip'}
+    thread = threading.current_thread()
+    results = {}
+    for name, path, before in get_api_scenarios(registry):
+        if only and not name.startswith(only):
+            continue
+        durations, queries, query_times, sizes = [], [], [], []
+        for i in range(args.warmup + args.iterations):
+            if before:
+                before()
+            start = time.perf_counter()
+            response = client.get(path, headers=headers)
+            body = response.get_data()
+            duration = time.perf_counter() - start
+            if response.status_code != 200:
+                raise RuntimeError("%s answered %s: %s" % (path, response.status_code, body[:200]))
+            if i >= args.warmup:
+                durations.append(duration)
+                queries.append(getattr(thread, 'query_count', 0))
+                query_times.append(getattr(thread, 'query_time', 0))
+                sizes.append(len(body))
+        if before:
+            before()
+        tracemalloc.start()
+        client.get(path, headers=headers).get_data()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results['api.' + name] = summarize(durations, queries, query_times, sizes, peak)
+        print_result('api.' + name, results['api.' + name])
+    return results
+
+
+def run_client_paths(args, registry, only):
+    """Load-test the Bonat client paths against the stub server, with
+    ``args.concurrency`` threads each working in its own transaction."""
+    from odoo.addons.pos_bonat_loyalty import metrics
+    from odoo.addons.pos_bonat_loyalty.benchmark.stub_server import BonatStubServer
+
+    stub = BonatStubServer(latency=args.stub_latency, error_rate=args.stub_error_rate, seed=args.seed).start()
+    params = {
+        'pos_bonat_loyalty.api_url': stub.url + '/odoo_partner',
+        'pos_bonat_loyalty.read_timeout': '2',
+    }
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        ICP = env['ir.config_parameter']
+        previous = {key: ICP.get_param(key) for key in params}
+        for key, value in params.items():
+            ICP.set_param(key, value)
+        company = env.ref('base.user_admin').company_id
+        previous_company = {name: company[name] for name in ('enable_bonat_integration', 'bonat_api_key', 'bonat_merchant_id')}
+        company.write({'enable_bonat_integration': True, 'bonat_api_key': 'bench', 'bonat_merchant_id': 'BENCH'})
+
+    def call(kind, i):
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env = env(user=env.ref('base.user_admin').id)
+            start = time.perf_counter()
+            if kind == 'code_check':
+                env['res.company'].get_bonat_code_response('BENCH-CODE-%d' % i)
+            elif kind == 'code_check.cached':
+                env['res.company'].get_bonat_code_response('BENCH-CODE-CACHED')
+            elif kind == 'redeem':
+                env['pos.session'].pos_reward_redeem({
+                    'reward_code': 'BENCH-REDEEM-%d' % i, 'merchant_id': 'BENCH', 'branch_id': '1',
+                    'date': '2024-01-01', 'timestamp': '1704067200',
+                })
+            elif kind == 'order_creation':
+                env['pos.session'].pos_order_creation_request({'order_id': i, 'total': 10}, idempotency_key='bench-%d' % i)
+            elif kind == 'order_delivery':
+                message = env['bonat.outbox']._enqueue('order', {'order_id': i, 'total': 10}, env.company, idempotency_key='bench-%d' % i)
+                start = time.perf_counter()
+                message._deliver()
+            duration = time.perf_counter() - start
+            cr.rollback()
+            return duration
+
+    results = {}
+    try:
+        for kind in ('code_check', 'code_check.cached', 'redeem', 'order_creation', 'order_delivery'):
+            name = 'client.' + kind
+            if only and not name.startswith(only):
+                continue
+            metrics.reset()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as executor:
+                durations = list(executor.map(lambda i: call(kind, i), range(args.client_calls)))
+            elapsed = time.perf_counter() - start
+            results[name] = dict(summarize(durations, [], [], [], None), throughput=len(durations) / elapsed, calls={
+                '%s %s' % (dict(h['labels'])['endpoint'], dict(h['labels'])['status']): h['count']
+                for h in metrics.snapshot()['histograms'] if h['name'] == 'bonat_call_seconds'
+            })
+            print_result(name, results[name])
+    finally:
+        stub.stop()
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            for key, value in previous.items():
+                env['ir.config_parameter'].set_param(key, value or False)
+            env.ref('base.user_admin').company_id.write(previous_company)
+    return results
+
+
+def print_result(name, result, baseline=None):
+    line = '%-28s %5d  median %9.2f ms  p95 %9.2f ms' % (name, result['n'], result['median_ms'], result['p95_ms'])
+    if result.get('queries') is not None:
+        line += '  %5d queries  sql %8.2f ms  %10d B  peak %9.1f KiB' % (
+            result['queries'], result['sql_ms'], result['bytes'], result['peak_kib'])
+    if result.get('throughput') is not None:
+        line += '  %8.1f calls/s  %s' % (result['throughput'], result['calls'])
+    if baseline:
+        line += '  (%+.1f%% vs baseline)' % ((result['median_ms'] / baseline['median_ms'] - 1) * 100)
+    print(line)
+
+
+def main(argv):
+    args, odoo_argv = parse_args(argv)
+    config.parse_config(odoo_argv)
+    odoo.service.server.load_server_wide_modules()
+    dbname = config['db_name'].split(',')[0]
+    if not dbname:
+        sys.exit("Give the benchmark database to Odoo, e.g. -- -d bonat_bench")
+    registry = odoo.modules.registry.Registry(dbname)
+
+    from odoo.addons.pos_bonat_loyalty.benchmark import data
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        if not data.is_generated(env):
+            print("Generating the benchmark data...")
+            start = time.perf_counter()
+            data.generate(env, seed=args.seed, products=args.products, categories=args.categories,
+                          configs=args.configs, sessions=args.sessions, orders=args.orders)
+            print("Generated in %.1f s" % (time.perf_counter() - start))
+
+    only = tuple(args.only.split(',')) if args.only else None
+    results = {'meta': {'args': vars(args), 'python': sys.version.split()[0], 'cpus': os.cpu_count()}}
+    results.update(run_api_scenarios(args, registry, get_api_key(registry), only))
+    results.update(run_client_paths(args, registry, only))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("\nCompared with %s" % args.compare)
+        for name, result in results.items():
+            if name != 'meta' and name in baseline:
+                print_result(name, result, baseline[name])
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Local stand-in for the Bonat partner API, used by the benchmarks.
+
+It answers ``reward-check``, ``redeem``, ``order`` and any webhook path
+like the real API, after an optional ``latency`` (seconds) and with an
+``error_rate`` share of ``503`` answers drawn from a seeded generator.
+Tests can queue the next answers with ``queue_response`` and inspect
+the requests received in ``received``. It only depends on the standard
+library and can run on its own::
+
+    python stub_server.py --port 8099 --latency 0.05 --error-rate 0.1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class BonatStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        payload = json.loads(body or b'{}')
+        endpoint = self.path.rstrip('/').rsplit('/', 1)[-1]
+        queued = server.record_request(endpoint, dict(self.headers), body)
+        if server.latency:
+            time.sleep(server.latency)
+        if queued:
+            self._send_json(*queued)
+        elif server.draw_error():
+            self._send_json(503, {'code': 1, 'errors': 'Injected error'})
+        elif endpoint == 'reward-check':
+            self._send_json(200, {'code': 0, 'data': {
+                'reward_code': payload.get('reward_code'),
+                'reward_type': 'discount_percentage',
+                'discount_amount': 10,
+                'is_partial_discount': False,
+                'allowed_products': [],
+            }})
+        elif endpoint in ('redeem', 'order'):
+            self._send_json(200, {'code': 0, 'data': {'id': payload.get('reward_code') or payload.get('order_id')}})
+        else:
+            self._send_json(200, {'received': True})
+
+
+class BonatStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency=0, error_rate=0, seed=0):
+        super().__init__(address, BonatStubHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = {}
+        self.received = []
+        self._queued = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+    def record_request(self, endpoint, headers, body):
+        """Count the request and return the queued ``(status, data)`` to
+        answer it with, if any."""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.received.append((endpoint, headers, body))
+            return self._queued.pop(0) if self._queued else None
+
+    def queue_response(self, status, data=None):
+        """Answer the next request with ``status`` and the JSON ``data``."""
+        with self._lock:
+            self._queued.append((status, data if data is not None else {'code': 0 if status == 200 else 1}))
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.received.clear()
+            self._queued.clear()
+
+    def draw_error(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='bonat-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=float, default=0, help="seconds before each answer")
+    parser.add_argument('--error-rate', type=float, default=0, help="share of 503 answers, from 0 to 1")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    server = BonatStubServer((args.host, args.port), latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    print("Bonat stub listening on %s" % server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
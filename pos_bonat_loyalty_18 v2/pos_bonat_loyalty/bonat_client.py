@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""HTTP client shared by every call to the Bonat partner API.
+
+Each Odoo process keeps one pooled ``requests.Session`` so consecutive
+calls reuse their TCP/TLS connection, and one circuit breaker per base URL
+so a Bonat outage makes calls fail fast instead of waiting for timeouts.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from odoo.addons.pos_bonat_loyalty import metrics
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.bonat.io/odoo_partner"
+# DEFAULT_BASE_URL = "https://stg-api.bonat.io/odoo_partner"
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+# consecutive failures opening the circuit, and seconds before a trial call
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+_breakers = {}
+
+
+class BonatUnavailable(requests.exceptions.ConnectionError):
+    """Raised without any network I/O while the circuit is open."""
+
+
+class CircuitBreaker:
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go through. Once ``reset_timeout`` has elapsed
+        a single trial call is let through; its outcome closes the circuit
+        or opens it again for another period."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    _logger.warning("Circuit of %s opened after %s consecutive failures", self.name, self.failures)
+                self.opened_at = time.monotonic()
+
+
+def get_session():
+    """Return the pooled session of the current process (recreated after a fork)."""
+    global _session, _session_pid
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def get_circuit_breaker(base_url):
+    with _lock:
+        if base_url not in _breakers:
+            _breakers[base_url] = CircuitBreaker(base_url)
+        return _breakers[base_url]
+
+
+class BonatClient:
+    metrics_endpoint = None
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self.breaker = get_circuit_breaker(self.base_url)
+
+    def get_url(self, endpoint):
+        return f"{self.base_url}/{endpoint}" if endpoint else self.base_url
+
+    def _get_headers(self, data, headers=None):
+        return dict(self.headers, **(headers or {}))
+
+    def post(self, endpoint, payload, headers=None):
+        """POST ``payload`` as JSON to ``endpoint`` and return the response.
+
+        Raises ``BonatUnavailable`` while the circuit is open, and the
+        usual ``requests`` exceptions on network errors. The latency of
+        every call is recorded in ``metrics`` with its status code, or the
+        class of the error.
+        """
+        start = time.perf_counter()
+        status = None
+        try:
+            if not self.breaker.allow():
+                raise BonatUnavailable("%s is unavailable, retry later." % self.base_url)
+            data = json.dumps(payload).encode()
+            try:
+                response = get_session().post(
+                    self.get_url(endpoint), data=data, headers=self._get_headers(data, headers), timeout=self.timeout,
+                )
+            except requests.exceptions.RequestException:
+                self.breaker.record_failure()
+                raise
+            status = response.status_code
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return response
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            metrics.observe(
+                'bonat_call_seconds', time.perf_counter() - start,
+                endpoint=self.metrics_endpoint or endpoint, status=str(status),
+            )
+
+
+class WebhookClient(BonatClient):
+    """Client of the partner webhook, posting to ``url`` itself (the
+    endpoint is empty) with a circuit breaker of its own.
+
+    The Bonat API key is never sent: with a ``secret``, bodies are signed
+    with HMAC-SHA256 in the ``X-Bonat-Signature`` header instead.
+    """
+    metrics_endpoint = 'webhook'
+
+    def __init__(self, url, secret=None, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+        super().__init__(None, base_url=url, connect_timeout=connect_timeout, read_timeout=read_timeout)
+        self.secret = secret
+
+    def _get_headers(self, data, headers=None):
+        headers = super()._get_headers(data, headers)
+        if self.secret:
+            signature = hmac.new(self.secret.encode(), data, hashlib.sha256).hexdigest()
+            headers["X-Bonat-Signature"] = f"sha256={signature}"
+        return headers
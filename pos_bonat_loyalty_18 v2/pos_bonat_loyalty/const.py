@@ -17,9 +17,25 @@ pos_config_m2m_fields = {
     'payment_method_ids': ['name', 'is_online_payment', 'type', 'sequence']
 }
 
+pos_session_filters = {
+    'date_from': ('start_at', '>=', 'datetime'),
+    'date_to': ('start_at', '<', 'datetime'),
+    'config_id': ('config_id', 'in', 'ids'),
+    'state': ('state', 'in', 'selection'),
+}
 pos_session_fields = ["company_id", "config_id", "name", "access_token", "user_id", "currency_id", "start_at", "stop_at", "state", "sequence_number", "login_number", "opening_notes", "closing_notes", "cash_control", "cash_journal_id", "cash_register_balance_end_real", "cash_register_balance_start", "cash_register_balance_end", "cash_register_difference", "cash_real_transaction", "order_ids", "order_count", "statement_line_ids", "payment_method_ids", "total_payments_amount", "is_in_company_currency", "update_stock_at_closing", "bank_payment_ids", "display_name", "create_uid", "create_date", "write_uid", "write_date"]
 
 pos_order_fields = ['name', 'date_order', 'user_id', 'amount_tax', 'amount_total', 'amount_paid', 'amount_return', 'margin', 'margin_percent', 'lines', 'company_id', 'country_code', 'refunded_order_id', 'pricelist_id', 'partner_id', 'sequence_number', 'session_id', 'config_id', 'currency_id', 'currency_rate', 'state', 'general_note', 'pos_reference', 'payment_ids', 'is_tipped', 'tip_amount', 'refund_orders_count', 'has_refundable_lines', 'has_refundable_lines', 'refund_orders_count', 'ticket_code', 'tracking_number', 'display_name', 'create_uid', 'create_date', 'write_uid', 'write_date', 'online_payment_method_id']
+# query parameter -> (field, operator, type) of the listing filters
+pos_order_filters = {
+    'date_from': ('date_order', '>=', 'datetime'),
+    'date_to': ('date_order', '<', 'datetime'),
+    'session_id': ('session_id', 'in', 'ids'),
+    'config_id': ('config_id', 'in', 'ids'),
+    'partner_id': ('partner_id', 'in', 'ids'),
+    'state': ('state', 'in', 'selection'),
+    'pos_reference': ('pos_reference', '=', 'char'),
+}
 pos_order_m2o_fields = {
     'partner_id': ['name', 'company_type', 'is_company', 'company_name', 'street', 'street2', 'city', 'zip', 'state_id', 'country_id', 'vat', 'phone', 'mobile', 'email', 'website']
 }
@@ -27,3 +43,85 @@ pos_order_o2m_fields = {
     'lines': ['attribute_value_ids', 'combo_line_ids', 'combo_parent_id', 'company_id', 'create_date', 'create_uid', 'currency_id', 'custom_attribute_value_ids', 'customer_note', 'discount', 'display_name', 'full_product_name', 'is_total_cost_computed', 'margin', 'margin_percent', 'name', 'notice', 'price_extra', 'price_subtotal', 'price_subtotal_incl', 'price_unit', 'product_id', 'product_uom_id', 'qty', 'refund_orderline_ids', 'refunded_orderline_id', 'refunded_qty', 'skip_change', 'tax_ids', 'tax_ids_after_fiscal_position', 'total_cost', 'uuid', 'write_date', 'write_uid'],
     'payment_ids': ['account_move_id', 'amount', 'card_type', 'cardholder_name', 'company_id', 'create_date', 'create_uid', 'currency_id', 'currency_rate', 'display_name', 'is_change', 'name', 'online_account_payment_id', 'partner_id', 'payment_date', 'payment_method_id', 'payment_status', 'pos_order_id', 'session_id', 'ticket', 'transaction_id', 'write_date', 'write_uid']
 }
+
+# REST API paging: default and maximum page size, and batch size of streamed exports
+api_page_size = 100
+api_max_page_size = 1000
+api_stream_batch_size = 500
+
+# REST API delta sync: write_date fields checked against `since`, and overlap
+# in seconds subtracted from the returned watermark (the start of the oldest
+# open transaction)
+delta_write_date_fields = {
+    'product.product': ['write_date', 'product_tmpl_id.write_date'],
+}
+api_delta_overlap = 60
+
+# Reward-check answers cached per worker: maximum entries and lifetime in seconds
+reward_check_cache_size = 1024
+reward_check_cache_ttl = 60
+
+# Minimum size in bytes of the JSON bodies sent compressed (gzip or brotli)
+api_compress_min_size = 1024
+
+# Catalog responses cached per worker: maximum entries, total bytes (bodies
+# and their compressed copies) and lifetime in seconds, size in bytes above
+# which a body is not cached, and the models whose changes invalidate the
+# export of each model (their cache version is bumped by bonat.cache.mixin)
+response_cache_size = 32
+response_cache_max_bytes = 64 * 1024 * 1024
+response_cache_ttl = 3600
+response_cache_max_body = 8 * 1024 * 1024
+response_cache_models = {
+    'product.product': ['product.product', 'product.template', 'product.category', 'product.tag',
+                        'product.template.attribute.value', 'account.tax', 'pos.category'],
+    'pos.category': ['pos.category'],
+    'pos.config': ['pos.config', 'pos.session', 'pos.payment.method'],
+}
+# stock models the products export also depends on when it holds one of
+# the stock fields, which change with every stock move
+response_cache_stock_models = ['stock.quant', 'stock.move', 'stock.valuation.layer', 'stock.warehouse.orderpoint']
+response_cache_stock_fields = {
+    'qty_available', 'virtual_available', 'free_qty', 'incoming_qty', 'outgoing_qty',
+    'reordering_min_qty', 'reordering_max_qty', 'avg_cost', 'total_value',
+}
+
+# /api/image: allowed `size` values, image fields of the POS API (the only
+# ones `size` applies to), Cache-Control max-age in seconds, and filestore
+# directory of the resized images with the days they are kept unused
+api_image_sizes = (128, 256, 512)
+api_image_fields = {
+    'product.product': ('image_1920', 'image_variant_1920'),
+    'pos.category': ('image_128',),
+}
+api_image_max_age = 86400
+api_image_cache_dir = 'bonat_image_cache'
+api_image_cache_keep_days = 30
+
+# Verified REST API keys cached per worker: maximum entries and lifetime in seconds
+api_key_cache_size = 256
+api_key_cache_ttl = 300
+
+# Sales summary: date buckets and the dimensions the aggregates can be grouped by
+summary_intervals = ('day', 'week', 'month', 'year')
+summary_groupby = ('date', 'config')
+
+# Snapshot exports: resource -> (model, domain, fields, relations), as served by the /api/pos/* routes
+export_resources = {
+    'products': ('product.product', [('available_in_pos', '=', True)], product_fields,
+                 {'m2o_fields': product_m2o_fields, 'm2m_fields': product_m2m_fields}),
+    'categories': ('pos.category', [], pos_categ_fields, {}),
+    'configs': ('pos.config', [], pos_config_fields, {'m2m_fields': pos_config_m2m_fields}),
+    'sessions': ('pos.session', [], pos_session_fields, {}),
+    'orders': ('pos.order', [], pos_order_fields,
+               {'m2o_fields': pos_order_m2o_fields, 'o2m_fields': pos_order_o2m_fields}),
+}
+# days a snapshot export is kept
+export_keep_days = 7
+# seconds a cron run spends on exports before leaving the rest to the next
+# run, well under limit_time_real_cron
+export_time_budget = 60
+# seconds after which a running export is deemed interrupted (worker killed
+# or restarted), and the interruptions it resumes from before being failed
+export_stale_after = 600
+export_max_attempts = 3
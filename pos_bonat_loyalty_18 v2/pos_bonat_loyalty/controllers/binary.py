@@ -1,28 +1,110 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import os
+import tempfile
+
+from werkzeug.exceptions import BadRequest
+
 from odoo import http
+from odoo.addons.pos_bonat_loyalty import const
 from odoo.addons.web.controllers.binary import Binary
-from odoo.http import request
+from odoo.http import request, Stream
 from odoo.exceptions import UserError
-from odoo.tools.image import image_guess_size_from_field_name
+from odoo.tools.image import image_guess_size_from_field_name, image_process
+
+# placeholder image bytes by size, they never change for a given version
+_placeholder_cache = {}
 
 
 class WebsiteBinary(Binary):
 
+    def _get_image_size(self, model, field, size):
+        if not size:
+            return None
+        if field not in const.api_image_fields.get(model, ()):
+            raise BadRequest('size is only available for the images exported by the POS API')
+        if not size.isdigit() or int(size) not in const.api_image_sizes:
+            raise BadRequest('size must be one of %s' % ', '.join(map(str, const.api_image_sizes)))
+        return int(size)
+
+    def _get_image_variant_field(self, record, field, size):
+        """Stored field holding ``field`` at ``size`` (``image_1920`` -> ``image_256``).
+
+        Returns ``(field, resize)`` where ``resize`` tells that no such field
+        exists and the image must be resized from ``field``.
+        """
+        if not size:
+            return field, False
+        for suffix in ('_1920', '_1024', '_512', '_256', '_128'):
+            if field.endswith(suffix):
+                variant = '%s_%d' % (field[:-len(suffix)], size)
+                if variant in record._fields:
+                    return variant, False
+        return field, True
+
+    def _get_resized_image_stream(self, stream, size):
+        """Resize ``stream`` to ``size``, through a cache of derived images
+        stored in the filestore and keyed by the source checksum."""
+        source_etag = stream.etag or hashlib.sha1(stream.read()).hexdigest()
+        etag = '%s-%d' % (source_etag, size)
+        cache_dir = os.path.join(request.env['ir.binary']._get_bonat_image_cache_dir(), etag[:2])
+        path = os.path.join(cache_dir, etag)
+        try:
+            # the modification time tells the autovacuum when it was last used
+            os.utime(path)
+        except FileNotFoundError:
+            data = image_process(stream.read(), size=(size, size))
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, path)
+        return Stream(
+            type='path',
+            path=path,
+            mimetype=stream.mimetype,
+            download_name=stream.download_name,
+            etag=etag,
+            size=os.path.getsize(path),
+            last_modified=stream.last_modified,
+        )
+
+    def _get_placeholder_stream(self, field, size):
+        if size:
+            width = height = size
+        else:
+            width, height = image_guess_size_from_field_name(field)
+        key = (width, height)
+        if key not in _placeholder_cache:
+            record = request.env.ref('web.image_placeholder').sudo()
+            stream = request.env['ir.binary']._get_image_stream_from(record, 'raw', width=width, height=height)
+            data = stream.read()
+            _placeholder_cache[key] = (data, stream.mimetype, hashlib.sha1(data).hexdigest())
+        data, mimetype, etag = _placeholder_cache[key]
+        return Stream(type='data', data=data, mimetype=mimetype, etag=etag, size=len(data))
+
     @http.route([
         '/api/image/<string:model>/<int:id>/<string:field>'
     ], type='http', auth="public")
-    def api_content_image(self, model='ir.attachment', id=None, field='raw', access_token=None):
+    def api_content_image(self, model='ir.attachment', id=None, field='raw', access_token=None, size=None, unique=None, **kw):
+        """Image of a record, optionally at ``size`` (128, 256 or 512 px) for
+        the images of the POS API (``const.api_image_fields``).
+
+        Responses carry the image checksum as ``ETag`` and are cacheable:
+        ``If-None-Match`` is answered with 304, and URLs holding a ``unique``
+        token (as exported by the POS API) are immutable.
+        """
+        size = self._get_image_size(model, field, size)
         try:
             record = request.env['ir.binary'].sudo()._find_record(None, model, id and int(id), access_token)
+            field, resize = self._get_image_variant_field(record, field, size)
             stream = request.env['ir.binary']._get_image_stream_from(record, field)
+            if resize:
+                stream = self._get_resized_image_stream(stream, size)
         except UserError as exc:
-            width, height = image_guess_size_from_field_name(field)
             # Use the ratio of the requested field_name instead of "raw"
-            record = request.env.ref('web.image_placeholder').sudo()
-            stream = request.env['ir.binary']._get_image_stream_from(
-                record, 'raw'
-            )
+            stream = self._get_placeholder_stream(field, size)
 
-        res = stream.get_response()
+        stream.max_age = const.api_image_max_age
+        res = stream.get_response(immutable=bool(unique))
         res.headers['Content-Security-Policy'] = "default-src 'none'"
         return res
@@ -1,188 +1,550 @@
 # -*- coding: utf-8 -*-
-import json
-from werkzeug.urls import url_join
+import functools
+import gzip
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import pytz
+from werkzeug.exceptions import BadRequest, Forbidden, HTTPException
+from werkzeug.http import http_date
 
-from odoo import http
-from odoo.addons.pos_bonat_loyalty import const
-from odoo.http import request
-from odoo.tools import DEFAULT_SERVER_DATE_FORMAT, DEFAULT_SERVER_DATETIME_FORMAT
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from odoo import api, http
+from odoo.addons.pos_bonat_loyalty import const, metrics, serializer
+from odoo.addons.pos_bonat_loyalty.cache import TTLCache
+from odoo.http import request, Response
+from odoo.osv import expression
+from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT, SQL
+
+# serialized catalog responses, see POSBonatAPIs._make_cached_response
+_response_cache = TTLCache(const.response_cache_size, const.response_cache_ttl, maxbytes=const.response_cache_max_bytes)
+
+
+def instrumented(route):
+    """Record the timings of an ``/api/pos/*`` route in ``metrics``: time,
+    SQL queries and their time, serialization time, rows and payload size.
+
+    Streamed responses are produced after the route returns, so only the
+    preparation of the stream is measured for them.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            thread = threading.current_thread()
+            query_count = getattr(thread, 'query_count', 0)
+            query_time = getattr(thread, 'query_time', 0)
+            start = time.perf_counter()
+            status = 500
+            with metrics.request_stats() as stats:
+                try:
+                    response = func(self, *args, **kwargs)
+                    status = response.status_code
+                    return response
+                except HTTPException as e:
+                    status = e.code
+                    raise
+                finally:
+                    labels = {'route': route, 'status': str(status)}
+                    metrics.observe('api_request_seconds', time.perf_counter() - start, **labels)
+                    metrics.observe('api_sql_queries', getattr(thread, 'query_count', 0) - query_count,
+                                    buckets=metrics.COUNT_BUCKETS, **labels)
+                    metrics.observe('api_sql_seconds', getattr(thread, 'query_time', 0) - query_time, **labels)
+                    metrics.observe('api_serialization_seconds', stats.get('serialization_seconds', 0), **labels)
+                    metrics.observe('api_rows', stats.get('rows', 0), buckets=metrics.COUNT_BUCKETS, **labels)
+                    metrics.observe('api_payload_bytes', stats.get('payload_bytes', 0), buckets=metrics.BYTES_BUCKETS, **labels)
+        return wrapper
+    return decorator
 
 
 class POSBonatAPIs(http.Controller):
 
-    def _get_m2o_field_data(self, field, value, fields):
-        rec = request.env[field.comodel_name].search_read([('id', '=', value[0])], fields[0])
-        return rec[0]
-
-    def _get_m2m_field_data(self, field, field_name, ids, field_list):
-        for k, fields in field_list.items():
-            if k == field_name:
-                rec = request.env[field.comodel_name].search_read([('id', 'in', ids)], fields, order="id")
-                return rec
-        return {}
-
-    def _get_o2m_field_data(self, field, model, field_name, ids, field_list):
-        for k, fields in field_list.items():
-            if k == field_name:
-                data = []
-                recs = request.env[field.comodel_name].search_read([('id', 'in', ids)], fields, order="id")
-                for recd in recs:
-                    rec = {}
-                    for field_name, value in recd.items():
-                        field = request.env[model]._fields.get(field_name)
-                        if field.type in ['date', 'datetime'] and value:
-                            value = self._get_date_field_data(field, value)
-                            rec.update({field_name: value})
-                        rec.update({field_name: value})
-                    data.append(rec)
-                return data
-        return {}
-
-    def _get_date_field_data(self, field, value):
-        if field.type == 'date':
-            return value.strftime(DEFAULT_SERVER_DATE_FORMAT)
-        return value.strftime(DEFAULT_SERVER_DATETIME_FORMAT)
-
-    def _get_image_url(self, field, model, field_name, res_id):
-        base_url = request.httprequest.url_root.strip('/') or request.env.user.get_base_url()
-        return url_join(base_url, '/api/image/%s/%d/%s' % (model, res_id, field_name))
-
-    def get_pos_product_data(self, prod_data):
-        data = {}
-        for field_name, value in prod_data.items():
-            field = request.env['product.product']._fields.get(field_name)
-            if field.type == 'many2one' and value:
-                if field_name in const.product_m2o_fields.keys():
-                    value = self._get_m2o_field_data(field, value, [v for v in const.product_m2o_fields.values()])
-                    data.update({field_name: value})
-            elif field.type == 'many2many' and value:
-                if field_name in const.product_m2m_fields.keys():
-                    value = self._get_m2m_field_data(field, field_name, value, const.product_m2m_fields)
-                    data.update({field_name: value})
-            elif field.type in ['date', 'datetime'] and value:
-                value = self._get_date_field_data(field, value)
-                data.update({field_name: value})
-            elif field.type == 'binary' and value:
-                value = self._get_image_url(field, 'product.product', field_name, prod_data['id'])
-                data.update({field_name: value})
-            data.update({field_name: value})
+    def _serialize_records(self, env, model, records, base_url=None, **relations):
+        start = time.perf_counter()
+        data = serializer.serialize_records(env, model, records, base_url=base_url or self._get_base_url(), **relations)
+        metrics.add_request_stat('serialization_seconds', time.perf_counter() - start)
+        metrics.add_request_stat('rows', len(data))
         return data
 
-    @http.route(['/api/pos/products', '/api/pos/products/<int:product_id>'], type="http", auth="bonatapi", methods=['GET'])
+    def _get_base_url(self):
+        return request.httprequest.url_root.strip('/') or request.env.user.get_base_url()
+
+    def _get_int_param(self, kw, name):
+        value = kw.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise BadRequest('%s must be an integer' % name)
+        if value < 0:
+            raise BadRequest('%s must be positive' % name)
+        return value
+
+    def _get_list_param(self, kw, name):
+        value = kw.get(name)
+        if value is None:
+            return None
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+    def _get_ids_param(self, kw):
+        """Ids of the ``ids`` parameter, in input order and without duplicates.
+
+        They come from the query string or form (``ids=3,1,2``) or from a
+        JSON body ``{"ids": [3, 1, 2]}``.
+        """
+        ids = kw.get('ids')
+        if ids is None and request.httprequest.mimetype == 'application/json':
+            try:
+                ids = (request.get_json_data() or {}).get('ids')
+            except (ValueError, AttributeError):
+                raise BadRequest('The body must be a JSON object')
+        if ids is None:
+            return None
+        if isinstance(ids, str):
+            ids = [res_id for res_id in ids.split(',') if res_id.strip()]
+        try:
+            ids = list(dict.fromkeys(int(res_id) for res_id in ids))
+        except (TypeError, ValueError):
+            raise BadRequest('ids must be a list of integers')
+        if len(ids) > const.api_max_page_size:
+            raise BadRequest('At most %s ids can be fetched at once' % const.api_max_page_size)
+        return ids
+
+    def _get_projection(self, env, model, kw, fields, relations):
+        """Apply the ``fields``, ``expand`` and ``count`` parameters.
+
+        ``fields`` restricts the exported fields to a subset of the route
+        fields, ``expand`` the relations exported as nested objects to a
+        subset of the route relations (all of them by default), and
+        ``count`` lists x2many fields to export as a number of records.
+        Relations that are not expanded come back as ids, as read.
+        Returns the fields to read and the arguments of ``_serialize_records``.
+        """
+        requested = self._get_list_param(kw, 'fields')
+        if requested is not None:
+            unknown = set(requested) - set(fields)
+            if unknown:
+                raise BadRequest('Unknown fields: %s' % ', '.join(sorted(unknown)))
+            fields = ['id'] + [field_name for field_name in dict.fromkeys(requested) if field_name != 'id']
+
+        expand = self._get_list_param(kw, 'expand')
+        if expand is not None:
+            expandable = {field_name for relation_fields in relations.values() for field_name in relation_fields}
+            unknown = set(expand) - expandable
+            if unknown:
+                raise BadRequest('Unknown relations: %s' % ', '.join(sorted(unknown)))
+            fields = fields + [field_name for field_name in expand if field_name not in fields]
+        relations = {
+            kind: {
+                field_name: comodel_fields
+                for field_name, comodel_fields in relation_fields.items()
+                if field_name in fields and (expand is None or field_name in expand)
+            }
+            for kind, relation_fields in relations.items()
+        }
+
+        count_fields = self._get_list_param(kw, 'count') or []
+        model_fields = env[model]._fields
+        unknown = {
+            field_name for field_name in count_fields
+            if field_name not in fields or model_fields[field_name].type not in ('one2many', 'many2many')
+        }
+        if unknown:
+            raise BadRequest('Cannot count: %s' % ', '.join(sorted(unknown)))
+        if count_fields:
+            relations = {kind: {name: value for name, value in relation_fields.items() if name not in count_fields}
+                         for kind, relation_fields in relations.items()}
+            relations['count_fields'] = set(count_fields)
+        return fields, relations
+
+    def _get_datetime_param(self, kw, name, tz=None):
+        """UTC datetime of the ISO 8601 parameter ``name``. Values without
+        an offset are in ``tz``, or UTC."""
+        value = kw.get(name)
+        if not value:
+            return None
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise BadRequest('%s must be an ISO 8601 datetime' % name)
+        if not value.tzinfo and tz:
+            value = pytz.timezone(tz).localize(value)
+        if value.tzinfo:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def _get_filter_domain(self, env, model, kw, filters, tz=None):
+        """Domain of the filters of ``filters`` (see ``const.pos_order_filters``)
+        given in ``kw``. ``ids`` and ``selection`` filters take a comma
+        separated list of values, ``datetime`` ones are read in ``tz``
+        when they have no offset."""
+        domain = []
+        for name, (field_name, operator, value_type) in filters.items():
+            if not kw.get(name):
+                continue
+            if value_type == 'datetime':
+                value = self._get_datetime_param(kw, name, tz=tz)
+            elif value_type == 'ids':
+                try:
+                    value = [int(item) for item in self._get_list_param(kw, name)]
+                except ValueError:
+                    raise BadRequest('%s must be a list of integers' % name)
+            elif value_type == 'selection':
+                value = self._get_list_param(kw, name)
+                unknown = set(value) - set(env[model]._fields[field_name].get_values(env))
+                if unknown:
+                    raise BadRequest('Unknown %s: %s' % (name, ', '.join(sorted(unknown))))
+            else:
+                value = kw[name]
+            domain.append((field_name, operator, value))
+        return domain
+
+    def _read_records(self, env, model, domain, fields, order, limit=None):
+        # binaries are only exported as URLs, so never load their content
+        return env[model].with_context(bin_size=True).search_read(domain, fields, order=order, limit=limit)
+
+    def _get_delta_domain(self, model, since):
+        write_date_fields = const.delta_write_date_fields.get(model, ['write_date'])
+        return expression.OR([[(field_name, '>', since)] for field_name in write_date_fields])
+
+    def _get_removed_ids(self, env, model, since, removed_domain=None):
+        """Ids of the records deleted, archived or hidden since ``since``."""
+        Model = env[model].with_context(active_test=False)
+        hidden_domains = [removed_domain] if removed_domain else []
+        if 'active' in Model._fields:
+            hidden_domains.append([('active', '=', False)])
+        removed_ids = set()
+        if hidden_domains:
+            domain = expression.AND([self._get_delta_domain(model, since), expression.OR(hidden_domains)])
+            removed_ids.update(Model.search(domain).ids)
+        removed_ids.update(env['bonat.deleted.record']._get_deleted_ids(model, since))
+        return sorted(removed_ids)
+
+    def _get_watermark(self, env):
+        """``since`` of the next delta sync.
+
+        ``write_date`` is the start time of the writing transaction, and
+        its rows only become visible when it commits, possibly minutes
+        later (e.g. closing a session). The watermark is thus no later than
+        the start of the oldest transaction still open, minus an overlap.
+        """
+        env.cr.execute(SQL(
+            """
+            SELECT min(xact_start) AT TIME ZONE 'UTC'
+              FROM pg_stat_activity
+             WHERE datname = current_database() AND state <> 'idle' AND xact_start IS NOT NULL
+            """
+        ))
+        oldest_start = env.cr.fetchone()[0]
+        watermark = min(filter(None, [oldest_start, env.cr.now()])) - timedelta(seconds=const.api_delta_overlap)
+        return watermark.strftime(DEFAULT_SERVER_DATETIME_FORMAT)
+
+    def _get_content_encoding(self, body):
+        """Compression accepted by the client, if ``body`` is large enough."""
+        if len(body) < const.api_compress_min_size:
+            return None
+        accept_encodings = request.httprequest.accept_encodings
+        if brotli and accept_encodings['br']:
+            return 'br'
+        if accept_encodings['gzip']:
+            return 'gzip'
+        return None
+
+    def _make_body_response(self, body, headers=None, encoded_bodies=None):
+        """JSON response for the ``body`` bytes, compressed if accepted.
+
+        ``encoded_bodies`` memoizes the compressed variants of a cached body.
+        """
+        headers = [("Content-Type", "application/json"), ("Vary", "Accept-Encoding")] + (headers or [])
+        encoding = self._get_content_encoding(body)
+        if encoding:
+            if encoded_bodies is not None and encoding in encoded_bodies:
+                body = encoded_bodies[encoding]
+            else:
+                body = brotli.compress(body, quality=5) if encoding == 'br' else gzip.compress(body, compresslevel=6)
+                if encoded_bodies is not None:
+                    encoded_bodies[encoding] = body
+            headers.append(("Content-Encoding", encoding))
+        metrics.add_request_stat('payload_bytes', len(body))
+        return request.make_response(body, headers=headers)
+
+    def _make_json_response(self, data):
+        return self._make_body_response(serializer.dumps(data))
+
+    def _get_cache_dependencies(self, model, fields):
+        dependencies = list(const.response_cache_models[model])
+        if model == 'product.product' and const.response_cache_stock_fields.intersection(fields):
+            dependencies += const.response_cache_stock_models
+        return dependencies
+
+    def _make_cached_response(self, model, fields, kw, get_payload):
+        """Serve ``get_payload()`` through the response cache of ``model``.
+
+        The cache key holds the route, its arguments, the user, companies
+        and language, and the cache versions of the models the exported
+        ``fields`` depend on, which also give the ``ETag``/``Last-Modified``
+        validators: an unchanged poll costs one small query and no
+        serialization at all.
+
+        Bodies larger than ``const.response_cache_max_body`` and delta
+        responses are only validated, not stored: ``since`` changes with
+        every poll, so they would never be served again.
+        """
+        env = request.env
+        dependencies = self._get_cache_dependencies(model, fields)
+        versions = env['bonat.cache.version']._get_versions(dependencies)
+        key = (
+            env.cr.dbname, env.uid, tuple(env.companies.ids), env.lang,
+            request.httprequest.path, tuple(sorted(kw.items())),
+            tuple(versions.get(dep_model, (0, None))[0] for dep_model in dependencies),
+        )
+        etag = hashlib.sha1(repr(key).encode()).hexdigest()
+        change_dates = [change_date for _version, change_date in versions.values()]
+        last_modified = max(change_dates).replace(tzinfo=timezone.utc) if change_dates else None
+        headers = [("ETag", 'W/"%s"' % etag), ("Cache-Control", "private, no-cache")]
+        if last_modified:
+            headers.append(("Last-Modified", http_date(last_modified)))
+
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            not_modified = httprequest.if_none_match.contains_weak(etag)
+        else:
+            not_modified = bool(last_modified and httprequest.if_modified_since
+                                and last_modified.replace(microsecond=0) <= httprequest.if_modified_since)
+        if not_modified:
+            return Response(status=304, headers=headers)
+
+        since = kw.get('since')
+        entry = None if since else _response_cache.get(key)
+        if entry is None:
+            body = serializer.dumps(get_payload())
+            if since or len(body) > const.response_cache_max_body:
+                return self._make_body_response(body, headers=headers)
+            entry = {'body': body, 'encoded': {}}
+            _response_cache.set(key, entry, size=len(body))
+        encoded_count = len(entry['encoded'])
+        response = self._make_body_response(entry['body'], headers=headers, encoded_bodies=entry['encoded'])
+        if len(entry['encoded']) != encoded_count:
+            # account for the compressed copy memoized in the entry
+            _response_cache.resize(key, len(entry['body']) + sum(len(body) for body in entry['encoded'].values()))
+        return response
+
+    def _make_records_response(self, model, domain, fields, order, kw, removed_domain=None, **relations):
+        """Build the response of a ``/api/pos/*`` listing route.
+
+        Without paging parameters the whole result is returned as a JSON
+        list, as before. ``limit`` and/or ``after_id`` switch to keyset
+        pagination on ``id`` and return ``{"data": [...], "next": id}``,
+        where ``next`` is the ``after_id`` of the following page (``null``
+        on the last one). ``stream=1`` streams every matching record as
+        NDJSON, reading them in fixed-size batches.
+
+        ``since`` restricts the result to the records created or changed
+        after that datetime. The first page also holds ``removed`` (ids
+        deleted, archived or matching ``removed_domain`` since then) and
+        ``watermark``, the ``since`` to use for the next sync.
+
+        ``fields``, ``expand`` and ``count`` select what is exported, see
+        ``_get_projection``.
+
+        ``ids`` (in the query string or a POST body, see ``_get_ids_param``)
+        fetches those records in one read and returns
+        ``{"data": [...], "missing": [...]}``, the records in the order of
+        ``ids`` and the ids not found.
+
+        Models listed in ``const.response_cache_models`` are served through
+        the response cache and answer conditional requests.
+        """
+        limit = self._get_int_param(kw, 'limit')
+        after_id = self._get_int_param(kw, 'after_id')
+        since = self._get_datetime_param(kw, 'since')
+        ids = self._get_ids_param(kw)
+        fields, relations = self._get_projection(request.env, model, kw, fields, relations)
+        if ids is not None:
+            return self._make_json_response(self._get_multi_get_payload(request.env, model, domain, fields, ids, relations))
+        if request.httprequest.method == 'POST':
+            raise BadRequest('POST requests must give ids')
+        if since:
+            domain = expression.AND([domain, self._get_delta_domain(model, since)])
+        if kw.get('stream') in ('1', 'true', 'ndjson'):
+            return self._make_stream_response(model, domain, fields, after_id, relations, since=since, removed_domain=removed_domain)
+
+        def get_payload():
+            return self._get_records_payload(request.env, model, domain, fields, order, limit, after_id, since, removed_domain, relations)
+
+        if model in const.response_cache_models:
+            return self._make_cached_response(model, fields, kw, get_payload)
+        return self._make_json_response(get_payload())
+
+    def _get_records_payload(self, env, model, domain, fields, order, limit, after_id, since, removed_domain, relations):
+        delta = {}
+        if since and not after_id:
+            delta = {
+                'removed': self._get_removed_ids(env, model, since, removed_domain),
+                'watermark': self._get_watermark(env),
+            }
+        if limit is None and after_id is None:
+            records = self._read_records(env, model, domain, fields, order)
+            data = self._serialize_records(env, model, records, **relations)
+            return dict(delta, data=data) if since else data
+
+        limit = min(limit or const.api_page_size, const.api_max_page_size)
+        if after_id:
+            domain = domain + [('id', '>', after_id)]
+        # read one extra row to know whether there is a next page
+        records = self._read_records(env, model, domain, fields, "id", limit=limit + 1)
+        next_id = records[limit - 1]['id'] if len(records) > limit else None
+        data = self._serialize_records(env, model, records[:limit], **relations)
+        return dict(delta, data=data, next=next_id)
+
+    def _get_multi_get_payload(self, env, model, domain, fields, ids, relations):
+        records = self._read_records(env, model, expression.AND([domain, [('id', 'in', ids)]]), fields, "id")
+        records_by_id = {rec['id']: rec for rec in self._serialize_records(env, model, records, **relations)}
+        return {
+            'data': [records_by_id[res_id] for res_id in ids if res_id in records_by_id],
+            'missing': [res_id for res_id in ids if res_id not in records_by_id],
+        }
+
+    def _make_stream_response(self, model, domain, fields, after_id, relations, since=None, removed_domain=None):
+        """Stream the records as NDJSON, one batch of rows in memory at a time.
+
+        The body is generated after the request cursor is closed, so the
+        generator opens its own cursor with the identity of the API user.
+        In delta mode the last line is ``{"removed": [...], "watermark": ...}``
+        unless the stream resumes from ``after_id``.
+        """
+        registry = request.env.registry
+        uid = request.env.uid
+        context = dict(request.env.context)
+        base_url = self._get_base_url()
+        batch_size = const.api_stream_batch_size
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                last_id = after_id or 0
+                while True:
+                    records = self._read_records(env, model, domain + [('id', '>', last_id)], fields, "id", limit=batch_size)
+                    for rec in self._serialize_records(env, model, records, base_url=base_url, **relations):
+                        yield serializer.dumps(rec) + b'\n'
+                    if len(records) < batch_size:
+                        break
+                    last_id = records[-1]['id']
+                    env.invalidate_all()
+                if since and not after_id:
+                    yield serializer.dumps({
+                        'removed': self._get_removed_ids(env, model, since, removed_domain),
+                        'watermark': self._get_watermark(env),
+                    }) + b'\n'
+
+        return Response(generate(), headers=[("Content-Type", "application/x-ndjson")], direct_passthrough=True)
+
+    @http.route(['/api/pos/products', '/api/pos/products/<int:product_id>'], type="http", auth="bonatapi", methods=['GET', 'POST'], csrf=False)
+    @instrumented('products')
     def get_pos_products(self, product_id=None, **kw):
-        data = []
         domain = [('available_in_pos', '=', True)]
         if product_id:
             domain += [('id', '=', product_id)]
-        products = request.env['product.product'].search_read(domain, const.product_fields, order="id desc")
-        for prod_data in products:
-            prod = self.get_pos_product_data(prod_data)
-            data.append(prod)
-
-        return request.make_response(
-            json.dumps(data),
-            headers=[("Content-Type", "application/json")]
-        )
+        return self._make_records_response('product.product', domain, const.product_fields, "id desc", kw,
+                                           removed_domain=[('available_in_pos', '=', False)],
+                                           m2o_fields=const.product_m2o_fields,
+                                           m2m_fields=const.product_m2m_fields)
 
-    @http.route(['/api/pos/categories', '/api/pos/categories/<int:category_id>'], type="http", auth="bonatapi", methods=['GET'])
+    @http.route(['/api/pos/categories', '/api/pos/categories/<int:category_id>'], type="http", auth="bonatapi", methods=['GET', 'POST'], csrf=False)
+    @instrumented('categories')
     def get_pos_categories(self, category_id=None, **kw):
-        data = []
         domain = []
         if category_id:
             domain += [('id', '=', category_id)]
-        categories = request.env['pos.category'].search_read(domain, const.pos_categ_fields, order="sequence")
-        for categ_data in categories:
-            categ_d = {}
-            for field_name, value in categ_data.items():
-                field = request.env['pos.category']._fields.get(field_name)
-                if field.type in ['date', 'datetime'] and value:
-                    value = self._get_date_field_data(field, value)
-                    categ_d.update({field_name: value})
-                elif field.type == 'binary' and value:
-                    value = self._get_image_url(field, 'pos.category', field_name, categ_data['id'])
-                    categ_d.update({field_name: value})
-                categ_d.update({field_name: value})
-            data.append(categ_d)
-
-        return request.make_response(
-            json.dumps(data),
-            headers=[("Content-Type", "application/json")]
-        )
+        return self._make_records_response('pos.category', domain, const.pos_categ_fields, "sequence", kw)
 
-    @http.route(['/api/pos/configs', '/api/pos/configs/<int:config_id>'], type="http", auth="bonatapi", methods=['GET'])
+    @http.route(['/api/pos/configs', '/api/pos/configs/<int:config_id>'], type="http", auth="bonatapi", methods=['GET', 'POST'], csrf=False)
+    @instrumented('configs')
     def get_pos_configs(self, config_id=None, **kw):
-        data = []
         domain = []
         if config_id:
             domain += [('id', '=', config_id)]
-        configs = request.env['pos.config'].search_read(domain, const.pos_config_fields, order="name")
-        for config_data in configs:
-            config_d = {}
-            for field_name, value in config_data.items():
-                field = request.env['pos.config']._fields.get(field_name)
-                if field.type == 'many2many' and value:
-                    if field_name in const.pos_config_m2m_fields.keys():
-                        value = self._get_m2m_field_data(field, field_name, value, const.pos_config_m2m_fields)
-                        config_d.update({field_name: value})
-                elif field.type in ['date', 'datetime'] and value:
-                    value = self._get_date_field_data(field, value)
-                    config_d.update({field_name: value})
-                config_d.update({field_name: value})
-            data.append(config_d)
-
-        return request.make_response(
-            json.dumps(data),
-            headers=[("Content-Type", "application/json")]
-        )
+        return self._make_records_response('pos.config', domain, const.pos_config_fields, "name", kw,
+                                           m2m_fields=const.pos_config_m2m_fields)
 
-    @http.route(['/api/pos/sessions', '/api/pos/sessions/<int:session_id>'], type="http", auth="bonatapi", methods=['GET'])
+    @http.route(['/api/pos/sessions', '/api/pos/sessions/<int:session_id>'], type="http", auth="bonatapi", methods=['GET', 'POST'], csrf=False)
+    @instrumented('sessions')
     def get_pos_sessions(self, session_id=None, **kw):
-        data = []
-        domain = []
+        domain = self._get_filter_domain(request.env, 'pos.session', kw, const.pos_session_filters)
         if session_id:
             domain += [('id', '=', session_id)]
-        sessions = request.env['pos.session'].search_read(domain, const.pos_session_fields, order="name")
-        for session_data in sessions:
-            session_d = {}
-            for field_name, value in session_data.items():
-                field = request.env['pos.session']._fields.get(field_name)
-                if field.type in ['date', 'datetime'] and value:
-                    value = self._get_date_field_data(field, value)
-                    session_d.update({field_name: value})
-                session_d.update({field_name: value})
-            data.append(session_d)
-
-        return request.make_response(
-            json.dumps(data),
-            headers=[("Content-Type", "application/json")]
-        )
+        return self._make_records_response('pos.session', domain, const.pos_session_fields, "id desc", kw)
 
-    @http.route(['/api/pos/orders', '/api/pos/orders/<int:order_id>'], type="http", auth="bonatapi", methods=['GET'])
+    @http.route(['/api/pos/orders', '/api/pos/orders/<int:order_id>'], type="http", auth="bonatapi", methods=['GET', 'POST'], csrf=False)
+    @instrumented('orders')
     def get_pos_orders(self, order_id=None, **kw):
-        data = []
-        domain = []
+        domain = self._get_filter_domain(request.env, 'pos.order', kw, const.pos_order_filters)
         if order_id:
             domain += [('id', '=', order_id)]
-        orders = request.env['pos.order'].search_read(domain, const.pos_order_fields, order="name")
-        for order_data in orders:
-            order_d = {}
-            for field_name, value in order_data.items():
-                field = request.env['pos.order']._fields.get(field_name)
-                if field.type == 'many2one' and value:
-                    if field_name in const.pos_order_m2o_fields.keys():
-                        value = self._get_m2o_field_data(field, value, [v for v in const.pos_order_m2o_fields.values()])
-                        order_d.update({field_name: value})
-                elif field.type == 'one2many' and value:
-                    if field_name in const.pos_order_o2m_fields.keys():
-                        value = self._get_o2m_field_data(field, field.comodel_name, field_name, value, const.pos_order_o2m_fields)
-                        order_d.update({field_name: value})
-                elif field.type in ['date', 'datetime'] and value:
-                    value = self._get_date_field_data(field, value)
-                    order_d.update({field_name: value})
-                order_d.update({field_name: value})
-            data.append(order_d)
-
-        return request.make_response(
-            json.dumps(data),
-            headers=[("Content-Type", "application/json")]
-        )
+        return self._make_records_response('pos.order', domain, const.pos_order_fields, "date_order desc, id desc", kw,
+                                           m2o_fields=const.pos_order_m2o_fields,
+                                           o2m_fields=const.pos_order_o2m_fields)
+
+    @http.route('/api/pos/orders/summary', type="http", auth="bonatapi", methods=['GET'])
+    @instrumented('orders_summary')
+    def get_pos_orders_summary(self, **kw):
+        """Sales totals per date bucket and point of sale, with the order
+        filters of ``/api/pos/orders`` (paid, done and invoiced orders by
+        default). ``interval`` is the date bucket (``day`` by default) and
+        ``groupby`` the dimensions, ``date,config`` by default.
+
+        Buckets are computed in the timezone of the API user, which is also
+        the one of ``date_from`` and ``date_to`` when they have no offset,
+        so that a range of days matches whole day buckets."""
+        interval = kw.get('interval') or 'day'
+        if interval not in const.summary_intervals:
+            raise BadRequest('interval must be one of %s' % ', '.join(const.summary_intervals))
+        groupby = self._get_list_param(kw, 'groupby')
+        if groupby is None:
+            groupby = const.summary_groupby
+        unknown = set(groupby) - set(const.summary_groupby)
+        if unknown:
+            raise BadRequest('Unknown groupby: %s' % ', '.join(sorted(unknown)))
+        tz = request.env['pos.order']._get_bonat_summary_tz()
+        domain = self._get_filter_domain(request.env, 'pos.order', kw, const.pos_order_filters, tz=tz)
+        if not kw.get('state'):
+            domain.append(('state', 'not in', ('draft', 'cancel')))
+        return self._make_json_response(request.env['pos.order']._get_bonat_sales_summary(domain, interval, groupby))
+
+    @http.route('/api/pos/exports', type="http", auth="bonatapi", methods=['POST'], csrf=False)
+    @instrumented('exports')
+    def create_pos_export(self, resource=None, **kw):
+        """Queue a snapshot export of ``resource`` (products, categories,
+        configs, sessions or orders), built in the background as a gzipped
+        NDJSON file. Poll the returned status until ``download_url`` is set."""
+        if resource not in const.export_resources:
+            raise BadRequest('resource must be one of %s' % ', '.join(const.export_resources))
+        export = request.env['bonat.export']._enqueue(resource, request.env.user, self._get_base_url())
+        return self._make_json_response(export._get_status())
+
+    @http.route('/api/pos/exports/<int:export_id>', type="http", auth="bonatapi", methods=['GET'])
+    @instrumented('export_status')
+    def get_pos_export(self, export_id, **kw):
+        export = request.env['bonat.export'].sudo().search([('id', '=', export_id), ('user_id', '=', request.env.uid)])
+        if not export:
+            raise request.not_found()
+        return self._make_json_response(export._get_status())
+
+    @http.route('/api/pos/metrics', type="http", auth="bonatapi", methods=['GET'])
+    def get_pos_metrics(self, **kw):
+        """Histograms of this worker (see ``metrics``) and the hit rates of
+        its caches. Restricted to API keys of administrators."""
+        if not request.env.user._is_system():
+            raise Forbidden()
+        data = metrics.snapshot()
+        data['caches'] = {
+            'api_keys': request.env['ir.http']._get_bonatapi_cache_stats(),
+            'responses': _response_cache.stats(),
+            'reward_checks': request.env['res.company']._get_bonat_code_cache_stats(),
+        }
+        return self._make_json_response(data)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Histograms of the Bonat API calls and of the POS REST API requests.
+
+Metrics are kept in memory by each Odoo process and exposed by
+``/api/pos/metrics``: with several workers, each response only covers the
+worker that served it (its ``pid`` is part of the response).
+"""
+import bisect
+import os
+import threading
+from contextlib import contextmanager
+
+# upper bounds of the histogram buckets
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+BYTES_BUCKETS = (1024, 10240, 102400, 1048576, 10485760, 104857600)
+
+_lock = threading.Lock()
+# (name, sorted labels) -> Histogram
+_histograms = {}
+_local = threading.local()
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.buckets + ('+Inf',), self.bucket_counts):
+            cumulative += count
+            buckets.append({'le': bound, 'count': cumulative})
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'avg': self.sum / self.count if self.count else 0,
+            'buckets': buckets,
+        }
+
+
+def observe(name, value, buckets=SECONDS_BUCKETS, **labels):
+    """Add ``value`` to the histogram ``name`` of ``labels``."""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def snapshot():
+    with _lock:
+        return {
+            'pid': os.getpid(),
+            'histograms': [
+                dict(histogram.to_dict(), name=name, labels=dict(labels))
+                for (name, labels), histogram in sorted(_histograms.items())
+            ],
+        }
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+@contextmanager
+def request_stats():
+    """Collect the stats of the current request, see ``add_request_stat``."""
+    _local.stats = stats = {}
+    try:
+        yield stats
+    finally:
+        _local.stats = None
+
+
+def add_request_stat(name, value):
+    """Add ``value`` to the stat ``name`` of the request being served, if any."""
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + value
@@ -1,7 +1,27 @@
 # coding: utf-8
 
+from . import account_tax
+from . import bonat_cache_version
+from . import bonat_change
+from . import bonat_deleted_record
+from . import bonat_export
+from . import bonat_outbox
+from . import ir_binary
 from . import ir_http
+from . import pos_category
 from . import pos_config
+from . import pos_order
+from . import pos_payment_method
 from . import pos_session
+from . import product_category
+from . import product_product
+from . import product_tag
+from . import product_template
+from . import product_template_attribute_value
 from . import res_company
 from . import res_config_settings
+from . import res_users_apikeys
+from . import stock_move
+from . import stock_quant
+from . import stock_valuation_layer
+from . import stock_warehouse_orderpoint
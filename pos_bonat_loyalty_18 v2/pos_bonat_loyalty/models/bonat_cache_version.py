@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class BonatCacheVersion(models.Model):
+    """Version counters of the models behind the cached API responses.
+
+    A transaction changing a model appends one row for it right before it
+    commits, and the version of a model is the sum of the weights of its
+    rows. The version is thus read in the same snapshot as the data it
+    describes, and, unlike a single counter row, concurrent writers never
+    conflict on it. The autovacuum merges the old rows of each model.
+    """
+    _name = 'bonat.cache.version'
+    _description = 'Bonat Cache Version'
+    _order = 'id'
+
+    name = fields.Char(string="Model", required=True, index=True)
+    weight = fields.Integer(required=True, default=1)
+    change_date = fields.Datetime(string="Changed On", required=True)
+
+    @api.model
+    def _bump(self, model_name):
+        """Increment the version of ``model_name`` once the transaction commits."""
+        names = self.env.cr.precommit.data.setdefault('bonat.cache.version', set())
+        if not names:
+            self.env.cr.precommit.add(self._flush_bumps)
+        names.add(model_name)
+
+    def _flush_bumps(self):
+        names = self.env.cr.precommit.data.pop('bonat.cache.version', set())
+        if not names:
+            return
+        # clock_timestamp() rather than now(): the change becomes visible at
+        # commit, not when the transaction started
+        self.env.cr.execute(SQL(
+            "INSERT INTO bonat_cache_version (name, weight, change_date) VALUES %s",
+            SQL(", ").join(SQL("(%s, 1, clock_timestamp() AT TIME ZONE 'UTC')", name) for name in sorted(names)),
+        ))
+
+    @api.model
+    def _get_versions(self, model_names):
+        """``{model: (version, last change date)}`` of the models changed at
+        least once, out of ``model_names``."""
+        self.env.cr.execute(SQL(
+            "SELECT name, SUM(weight), MAX(change_date) FROM bonat_cache_version WHERE name IN %s GROUP BY name",
+            tuple(model_names),
+        ))
+        return {name: (int(version), change_date) for name, version, change_date in self.env.cr.fetchall()}
+
+    @api.autovacuum
+    def _gc_compact_versions(self):
+        """Merge the rows older than a day into one row per model, in a
+        single statement so that no version ever goes back."""
+        self.env.cr.execute(SQL(
+            """
+            WITH old AS (
+                DELETE FROM bonat_cache_version WHERE change_date < %s
+                RETURNING name, weight, change_date
+            )
+            INSERT INTO bonat_cache_version (name, weight, change_date)
+            SELECT name, SUM(weight), MAX(change_date) FROM old GROUP BY name
+            """,
+            fields.Datetime.now() - timedelta(days=1),
+        ))
+
+
+class BonatCacheMixin(models.AbstractModel):
+    """Bump the cache version of the model on every creation, write and
+    deletion, see ``bonat.cache.version``."""
+    _name = 'bonat.cache.mixin'
+    _description = 'Bonat Cache Invalidation Mixin'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['bonat.cache.version']._bump(self._name)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self:
+            self.env['bonat.cache.version']._bump(self._name)
+        return res
+
+    def unlink(self):
+        if self:
+            self.env['bonat.cache.version']._bump(self._name)
+        return super().unlink()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import api, fields, models
+from odoo.addons.pos_bonat_loyalty.models.bonat_outbox import WEBHOOK_URL_PARAM
+from odoo.tools import SQL
+
+
+class BonatChange(models.Model):
+    """Records changed since the last push to the Bonat webhook.
+
+    There is at most one row per record: changes made before the next
+    dispatch are coalesced into a single notification.
+    """
+    _name = 'bonat.change'
+    _description = 'Bonat Pending Change'
+    _order = 'change_date, id'
+
+    res_model = fields.Char(string="Model", required=True)
+    res_id = fields.Integer(string="Record ID", required=True)
+    company_id = fields.Many2one('res.company')
+    change_date = fields.Datetime(string="Changed On", required=True)
+
+    _sql_constraints = [
+        ('record_uniq', 'unique(res_model, res_id)', 'A record can only have one pending change.'),
+    ]
+
+    @api.model
+    def _is_push_enabled(self):
+        return bool(self.env['ir.config_parameter'].sudo().get_param(WEBHOOK_URL_PARAM))
+
+    @api.model
+    def _record_changes(self, records):
+        """Mark ``records`` as changed once the transaction commits.
+
+        The ids are gathered in memory for the whole transaction and
+        written with a single upsert right before the commit.
+        """
+        if not records or not self._is_push_enabled():
+            return
+        changes = self.env.cr.precommit.data.setdefault('bonat.change', {})
+        if not changes:
+            self.env.cr.precommit.add(self._flush_changes)
+        has_company = 'company_id' in records._fields
+        for record in records:
+            changes[(records._name, record.id)] = record.company_id.id if has_company else None
+
+    def _flush_changes(self):
+        changes = self.env.cr.precommit.data.pop('bonat.change', {})
+        if not changes:
+            return
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO bonat_change (res_model, res_id, company_id, change_date)
+            VALUES %s
+            ON CONFLICT (res_model, res_id) DO UPDATE SET change_date = EXCLUDED.change_date
+            """,
+            SQL(", ").join(
+                SQL("(%s, %s, %s, now() AT TIME ZONE 'UTC')", res_model, res_id, company_id)
+                for (res_model, res_id), company_id in changes.items()
+            ),
+        ))
+
+    def _get_change_payload(self):
+        """``{"changes": {model: [{"id", "write_date"}]}, "removed": {model: [ids]}}``
+        of the changes in ``self``."""
+        ids_by_model = defaultdict(list)
+        for change in self:
+            ids_by_model[change.res_model].append(change.res_id)
+        payload = {'changes': {}, 'removed': {}}
+        for model, ids in ids_by_model.items():
+            rows = self.env[model].sudo().with_context(active_test=False).search_read(
+                [('id', 'in', ids)], ['write_date'], order='id')
+            payload['changes'][model] = [
+                {'id': row['id'], 'write_date': fields.Datetime.to_string(row['write_date'])} for row in rows
+            ]
+            existing_ids = {row['id'] for row in rows}
+            removed_ids = sorted(res_id for res_id in ids if res_id not in existing_ids)
+            if removed_ids:
+                payload['removed'][model] = removed_ids
+        return payload
+
+    @api.model
+    def _cron_dispatch_changes(self, batch_size=1000):
+        """Push the pending changes to the webhook, one message per company.
+
+        Records without a company are sent to every company using Bonat.
+        Delivery and retries go through the outbox.
+        """
+        changes = self.search([], limit=batch_size)
+        if not changes:
+            return
+        if self._is_push_enabled():
+            companies = self.env['res.company'].search([
+                ('enable_bonat_integration', '=', True),
+                ('bonat_api_key', '!=', False),
+            ])
+            for company in companies:
+                company_changes = changes.filtered(lambda change: not change.company_id or change.company_id == company)
+                if company_changes:
+                    payload = dict(company_changes._get_change_payload(), merchant_id=company.bonat_merchant_id)
+                    self.env['bonat.outbox']._enqueue('change', payload, company)
+        changes.unlink()
+        if len(changes) == batch_size:
+            self.env.ref('pos_bonat_loyalty.ir_cron_bonat_change_dispatch')._trigger()
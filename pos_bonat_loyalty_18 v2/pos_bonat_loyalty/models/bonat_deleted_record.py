@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class BonatDeletedRecord(models.Model):
+    _name = 'bonat.deleted.record'
+    _description = 'Bonat Deleted Record'
+    _order = 'id'
+
+    res_model = fields.Char(string="Model", required=True, index=True)
+    res_id = fields.Integer(string="Record ID", required=True)
+    deleted_date = fields.Datetime(string="Deleted On", required=True, index=True, default=fields.Datetime.now)
+
+    @api.model
+    def _record_deletion(self, records):
+        """Keep a tombstone of ``records`` so delta syncs can report them."""
+        if records:
+            self.sudo().create([{'res_model': records._name, 'res_id': res_id} for res_id in records.ids])
+
+    @api.model
+    def _get_deleted_ids(self, model, since):
+        tombstones = self.sudo().search_read([('res_model', '=', model), ('deleted_date', '>', since)], ['res_id'])
+        return [tombstone['res_id'] for tombstone in tombstones]
+
+    @api.autovacuum
+    def _gc_deleted_records(self):
+        limit_date = fields.Datetime.now() - timedelta(days=90)
+        self.sudo().search([('deleted_date', '<', limit_date)]).unlink()
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import config
+from odoo.addons.pos_bonat_loyalty import const, serializer
+
+_logger = logging.getLogger(__name__)
+
+# bytes read or copied at once when storing a snapshot
+CHUNK_SIZE = 1024 * 1024
+
+
+class BonatExport(models.Model):
+    """Snapshot of a POS API resource, built in the background.
+
+    The records are read in batches and written to a gzipped NDJSON file,
+    one JSON object per line, so neither the request workers nor the
+    memory of the cron worker depend on the size of the resource. Each
+    batch is committed with its checkpoint, so that a long export spans
+    several cron runs and survives a worker restart.
+    """
+    _name = 'bonat.export'
+    _description = 'Bonat Snapshot Export'
+    _order = 'id desc'
+
+    resource = fields.Selection([
+        ('products', 'Products'),
+        ('categories', 'Categories'),
+        ('configs', 'Points of Sale'),
+        ('sessions', 'Sessions'),
+        ('orders', 'Orders'),
+    ], required=True)
+    user_id = fields.Many2one('res.users', required=True, index=True, ondelete='cascade')
+    base_url = fields.Char(required=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], default='queued', required=True, index=True)
+    record_count = fields.Integer()
+    attachment_id = fields.Many2one('ir.attachment', ondelete='set null')
+    error = fields.Text()
+    attempt_count = fields.Integer(default=0)
+    # checkpoint: last record written to the partial file, and the size of
+    # that file up to it
+    last_id = fields.Integer(default=0)
+    partial_size = fields.Integer(default=0)
+    date_started = fields.Datetime()
+    date_done = fields.Datetime()
+
+    @api.model
+    def _enqueue(self, resource, user, base_url):
+        export = self.sudo().create({'resource': resource, 'user_id': user.id, 'base_url': base_url})
+        self.env.ref('pos_bonat_loyalty.ir_cron_bonat_export')._trigger()
+        return export
+
+    def _get_status(self):
+        self.ensure_one()
+        status = {
+            'id': self.id,
+            'resource': self.resource,
+            'state': self.state,
+            'record_count': self.record_count,
+            'error': self.error or None,
+            'create_date': fields.Datetime.to_string(self.create_date),
+            'date_done': fields.Datetime.to_string(self.date_done) if self.date_done else None,
+            'download_url': None,
+        }
+        if self.state == 'done' and self.attachment_id:
+            attachment = self.attachment_id.sudo()
+            status['download_url'] = '%s/web/content/%s?access_token=%s&download=true' % (
+                self.base_url, attachment.id, attachment.generate_access_token()[0])
+        return status
+
+    def _get_partial_path(self):
+        """File the snapshot is appended to, batch by batch, until complete."""
+        self.ensure_one()
+        return os.path.join(config.filestore(self.env.cr.dbname), 'bonat_exports', '%s.ndjson.gz.part' % self.id)
+
+    def _remove_partial_file(self):
+        for export in self:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(export._get_partial_path())
+
+    def _write_batch(self, batch_size):
+        """Append the records after ``last_id`` to the partial file, with the
+        access rights of the export user, and move the checkpoint after them.
+        Returns whether the snapshot is complete.
+
+        Each batch is a gzip member of its own, concatenated members being a
+        valid gzip file, and whatever an interrupted run wrote after the
+        checkpoint is truncated first.
+        """
+        self.ensure_one()
+        model, domain, field_names, relations = const.export_resources[self.resource]
+        env = self.env(user=self.user_id.id, su=False)
+        records = env[model].with_context(bin_size=True).search_read(
+            domain + [('id', '>', self.last_id)], field_names, order="id", limit=batch_size)
+        path = self._get_partial_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as fileobj:
+            fileobj.truncate(self.partial_size)
+            fileobj.seek(self.partial_size)
+            with gzip.GzipFile(fileobj=fileobj, mode='wb') as gzfile:
+                for rec in serializer.serialize_records(env, model, records, base_url=self.base_url, **relations):
+                    gzfile.write(serializer.dumps(rec) + b'\n')
+            fileobj.flush()
+            os.fsync(fileobj.fileno())
+            partial_size = fileobj.tell()
+        vals = {'record_count': self.record_count + len(records), 'partial_size': partial_size}
+        if records:
+            vals['last_id'] = records[-1]['id']
+        self.write(vals)
+        env.invalidate_all()
+        return len(records) < batch_size
+
+    def _create_attachment(self, fileobj):
+        """Attachment of the snapshot in ``fileobj``.
+
+        With the filestore, the file is hashed and copied there chunk by
+        chunk instead of being loaded in memory. Attachments stored in the
+        database need their content at once.
+        """
+        self.ensure_one()
+        Attachment = self.env['ir.attachment'].sudo()
+        vals = {
+            'name': 'bonat-%s-%s.ndjson.gz' % (self.resource, self.id),
+            'mimetype': 'application/gzip',
+            'res_model': self._name,
+            'res_id': self.id,
+        }
+        fileobj.seek(0)
+        if Attachment._storage() != 'file':
+            return Attachment.create(dict(vals, raw=fileobj.read()))
+
+        sha1 = hashlib.sha1()
+        size = 0
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+            sha1.update(chunk)
+            size += len(chunk)
+        checksum = sha1.hexdigest()
+        store_fname, full_path = Attachment._get_path(b'', checksum)
+        if not os.path.exists(full_path):
+            fileobj.seek(0)
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(full_path), delete=False) as tmp:
+                shutil.copyfileobj(fileobj, tmp, CHUNK_SIZE)
+            os.replace(tmp.name, full_path)
+        return Attachment.create(dict(vals, store_fname=store_fname, file_size=size, checksum=checksum))
+
+    def _complete(self):
+        self.ensure_one()
+        path = self._get_partial_path()
+        with open(path, 'rb') as fileobj:
+            attachment = self._create_attachment(fileobj)
+        self.write({'state': 'done', 'attachment_id': attachment.id, 'date_done': fields.Datetime.now()})
+        # should this transaction be lost, the export restarts from scratch
+        self._remove_partial_file()
+
+    def _run(self, deadline, auto_commit=True):
+        """Build the snapshot batch by batch from the checkpoint, committing
+        after each batch, until it is complete or ``deadline`` (a
+        ``time.monotonic()`` value) is passed. Returns whether it is complete."""
+        self.ensure_one()
+        if self.partial_size and not os.path.exists(self._get_partial_path()):
+            _logger.warning("Bonat %s export %s lost its partial file, restarted", self.resource, self.id)
+            self.write({'last_id': 0, 'record_count': 0, 'partial_size': 0})
+        while True:
+            with self.env.cr.savepoint():
+                complete = self._write_batch(const.api_stream_batch_size)
+                if complete:
+                    self._complete()
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            if complete:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+
+    @api.model
+    def _recover_stale_exports(self):
+        """Queue again, to resume from their checkpoint, the exports left
+        running by a worker killed or restarted meanwhile, or fail them once
+        interrupted ``const.export_max_attempts`` times."""
+        limit_date = fields.Datetime.now() - timedelta(seconds=const.export_stale_after)
+        stale = self.search([('state', '=', 'running'), ('date_started', '<', limit_date)])
+        for export in stale:
+            if export.attempt_count < const.export_max_attempts:
+                _logger.warning("Bonat %s export %s was interrupted, queued again", export.resource, export.id)
+                export.write({'state': 'queued', 'attempt_count': export.attempt_count + 1})
+            else:
+                export.write({
+                    'state': 'failed',
+                    'error': "The export was interrupted %s times." % (export.attempt_count + 1),
+                    'date_done': fields.Datetime.now(),
+                })
+                export._remove_partial_file()
+
+    @api.model
+    def _cron_run_exports(self):
+        """Build the queued exports, oldest first, for at most
+        ``const.export_time_budget`` seconds. An export still incomplete by
+        then is queued again and the cron triggered, so that the next run
+        resumes it from its checkpoint."""
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        deadline = time.monotonic() + const.export_time_budget
+        cron = self.env.ref('pos_bonat_loyalty.ir_cron_bonat_export')
+        self._recover_stale_exports()
+        for export in self.search([('state', '=', 'queued')], order='id'):
+            if time.monotonic() >= deadline:
+                cron._trigger()
+                break
+            export.write({'state': 'running', 'date_started': fields.Datetime.now()})
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            try:
+                complete = export._run(deadline, auto_commit=auto_commit)
+            except Exception as e:
+                self.env.invalidate_all()
+                _logger.exception("Bonat %s export %s failed", export.resource, export.id)
+                export.write({'state': 'failed', 'error': str(e), 'date_done': fields.Datetime.now()})
+                export._remove_partial_file()
+            else:
+                if not complete:
+                    export.state = 'queued'
+                    cron._trigger()
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    @api.autovacuum
+    def _gc_exports(self):
+        limit_date = fields.Datetime.now() - timedelta(days=const.export_keep_days)
+        exports = self.sudo().search([('create_date', '<', limit_date)])
+        exports.attachment_id.unlink()
+        exports._remove_partial_file()
+        exports.unlink()
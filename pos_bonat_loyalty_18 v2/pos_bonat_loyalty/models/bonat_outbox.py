@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+import requests
+
+from odoo import api, fields, models
+from odoo.addons.pos_bonat_loyalty import bonat_client
+
+_logger = logging.getLogger(__name__)
+
+BONAT_OUTBOX_ENDPOINTS = {
+    'order': "order",
+    'redeem': "redeem",
+}
+# webhook receiving the change notifications (see bonat.change), and the
+# optional secret signing them
+WEBHOOK_URL_PARAM = 'pos_bonat_loyalty.webhook_url'
+WEBHOOK_SECRET_PARAM = 'pos_bonat_loyalty.webhook_secret'
+
+# HTTP statuses worth retrying, any other error status is final
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class BonatOutbox(models.Model):
+    _name = 'bonat.outbox'
+    _description = 'Bonat Outbox'
+    _order = 'id'
+
+    kind = fields.Selection([
+        ('order', 'Order Creation'),
+        ('redeem', 'Reward Redeem'),
+        ('change', 'Change Notification'),
+    ], required=True)
+    company_id = fields.Many2one('res.company', required=True, index=True)
+    payload = fields.Json(required=True)
+    idempotency_key = fields.Char(required=True, copy=False)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Delivered'),
+        ('failed', 'Failed'),
+    ], default='pending', required=True, index=True)
+    attempt_count = fields.Integer(default=0)
+    next_attempt_date = fields.Datetime(default=fields.Datetime.now, index=True)
+    last_error = fields.Text()
+    response_data = fields.Json()
+
+    _sql_constraints = [
+        ('idempotency_key_uniq', 'unique(kind, idempotency_key)', 'A Bonat message with this idempotency key already exists.'),
+    ]
+
+    @api.model
+    def _enqueue(self, kind, payload, company, idempotency_key=None):
+        """Store a message for Bonat and wake up the delivery cron.
+
+        Enqueuing the same ``(kind, idempotency_key)`` twice returns the
+        existing message, so POS retries never send an event twice.
+        """
+        idempotency_key = idempotency_key or str(uuid.uuid4())
+        message = self.sudo().search([('kind', '=', kind), ('idempotency_key', '=', idempotency_key)], limit=1)
+        if not message:
+            message = self.sudo().create({
+                'kind': kind,
+                'payload': payload,
+                'company_id': company.id,
+                'idempotency_key': idempotency_key,
+            })
+            self.env.ref('pos_bonat_loyalty.ir_cron_bonat_outbox')._trigger()
+        return message
+
+    @api.model
+    def _get_redeem_key(self, merchant_id, reward_code):
+        return f"{merchant_id}:{reward_code}"
+
+    @api.model
+    def _record_delivered(self, kind, payload, company, idempotency_key, response_data=None):
+        """Journal a message already sent synchronously, so the outbox knows
+        about it (e.g. a redeemed code) without delivering it again."""
+        message = self.sudo().search([('kind', '=', kind), ('idempotency_key', '=', idempotency_key)], limit=1)
+        vals = {'state': 'done', 'response_data': response_data}
+        if message:
+            message.write(vals)
+        else:
+            message = self.sudo().create(dict(vals, kind=kind, payload=payload, company_id=company.id, idempotency_key=idempotency_key))
+        return message
+
+    @api.model
+    def _is_redeemed(self, merchant_id, reward_code):
+        """Whether a redemption of ``reward_code`` was sent or queued."""
+        return bool(self.sudo().search_count([
+            ('kind', '=', 'redeem'),
+            ('idempotency_key', '=', self._get_redeem_key(merchant_id, reward_code)),
+            ('state', '!=', 'failed'),
+        ], limit=1))
+
+    def _get_client(self):
+        """``(client, endpoint)`` to deliver the message with, or
+        ``(None, None)`` when no webhook is configured for a change."""
+        self.ensure_one()
+        if self.kind != 'change':
+            return self.company_id._get_bonat_client(), BONAT_OUTBOX_ENDPOINTS[self.kind]
+        ICP = self.env['ir.config_parameter'].sudo()
+        url = ICP.get_param(WEBHOOK_URL_PARAM)
+        if not url:
+            return None, None
+        return bonat_client.WebhookClient(
+            url,
+            secret=ICP.get_param(WEBHOOK_SECRET_PARAM),
+            connect_timeout=float(ICP.get_param('pos_bonat_loyalty.connect_timeout', bonat_client.DEFAULT_CONNECT_TIMEOUT)),
+            read_timeout=float(ICP.get_param('pos_bonat_loyalty.read_timeout', bonat_client.DEFAULT_READ_TIMEOUT)),
+        ), ''
+
+    def _get_retry_delay(self):
+        self.ensure_one()
+        return timedelta(seconds=min(30 * 2 ** self.attempt_count, 6 * 3600))
+
+    def _deliver(self):
+        """Send the message once and update its state.
+
+        Network errors and retryable HTTP statuses reschedule the message
+        with an exponential backoff until the maximum number of attempts.
+        """
+        self.ensure_one()
+        company = self.company_id
+        if not company.enable_bonat_integration or not company.bonat_api_key:
+            self.write({'state': 'failed', 'last_error': "Bonat integration is not enabled or API key is missing."})
+            return
+        client, endpoint = self._get_client()
+        if client is None:
+            self.write({'state': 'failed', 'last_error': "No Bonat webhook URL is configured."})
+            return
+        vals = {'attempt_count': self.attempt_count + 1}
+        retry = False
+        try:
+            response = client.post(endpoint, self.payload, headers={"Idempotency-Key": self.idempotency_key})
+            if self.kind == 'change' and response.ok:
+                # webhooks only acknowledge the notification
+                vals.update(state='done', last_error=False)
+            elif response.status_code == 200:
+                data = response.json()
+                if data.get("code") == 0:
+                    vals.update(state='done', response_data=data.get("data"), last_error=False)
+                else:
+                    vals.update(state='failed', last_error=str(data.get("errors", "Invalid code.")))
+            else:
+                retry = response.status_code in RETRYABLE_STATUS
+                vals['last_error'] = f"API Error: {response.status_code} - {response.text}"
+        except bonat_client.BonatUnavailable:
+            # the API is known to be down: wait for the circuit to close
+            # without spending one of the delivery attempts
+            self.next_attempt_date = fields.Datetime.now() + timedelta(seconds=bonat_client.CIRCUIT_RESET_TIMEOUT)
+            return
+        except requests.exceptions.RequestException as e:
+            retry = True
+            vals['last_error'] = f"Request error: {str(e)}"
+        except ValueError as e:
+            retry = True
+            vals['last_error'] = f"Invalid response: {str(e)}"
+
+        if 'state' not in vals:
+            if retry and vals['attempt_count'] < self._get_max_attempts():
+                vals['next_attempt_date'] = fields.Datetime.now() + self._get_retry_delay()
+            else:
+                vals['state'] = 'failed'
+            _logger.warning("Bonat %s message %s not delivered (attempt %s): %s",
+                            self.kind, self.idempotency_key, vals['attempt_count'], vals['last_error'])
+        self.write(vals)
+
+    @api.model
+    def _get_max_attempts(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('pos_bonat_loyalty.outbox_max_attempts', 10))
+
+    @api.model
+    def _cron_process_outbox(self, batch_size=100):
+        """Deliver the pending messages that are due, oldest first."""
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        messages = self.search([
+            ('state', '=', 'pending'),
+            ('next_attempt_date', '<=', fields.Datetime.now()),
+        ], limit=batch_size)
+        for message in messages:
+            message._deliver()
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+        if len(messages) == batch_size:
+            self.env.ref('pos_bonat_loyalty.ir_cron_bonat_outbox')._trigger()
+
+    @api.autovacuum
+    def _gc_delivered_messages(self):
+        limit_date = fields.Datetime.now() - timedelta(days=30)
+        self.sudo().search([('state', '=', 'done'), ('write_date', '<', limit_date)]).unlink()
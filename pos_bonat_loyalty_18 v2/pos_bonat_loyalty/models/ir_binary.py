@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import time
+
+from odoo import api, models
+from odoo.addons.pos_bonat_loyalty import const
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+
+class IrBinary(models.AbstractModel):
+    _inherit = 'ir.binary'
+
+    @api.model
+    def _get_bonat_image_cache_dir(self):
+        """Filestore directory of the images resized by ``/api/image``."""
+        return os.path.join(config.filestore(self.env.cr.dbname), const.api_image_cache_dir)
+
+    @api.autovacuum
+    def _gc_bonat_image_cache(self):
+        """Remove the resized images not served for ``const.api_image_cache_keep_days``."""
+        limit_time = time.time() - const.api_image_cache_keep_days * 86400
+        removed = 0
+        for dirpath, _dirnames, filenames in os.walk(self._get_bonat_image_cache_dir()):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    if os.path.getmtime(path) < limit_time:
+                        os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        if removed:
+            _logger.info("Removed %s unused resized images", removed)
@@ -1,13 +1,52 @@
 # -*- coding: utf-8 -*-
+import hashlib
+
 from werkzeug.exceptions import BadRequest
 
 from odoo import models
+from odoo.addons.base.models.res_users import INDEX_SIZE
+from odoo.addons.pos_bonat_loyalty import const
+from odoo.addons.pos_bonat_loyalty.cache import TTLCache
 from odoo.http import request
 
+API_KEY_SCOPE = 'odoo.restapi'
+# verified API keys by (database, sha256 of the key) -> (user id, key index)
+_api_key_cache = TTLCache(const.api_key_cache_size, const.api_key_cache_ttl)
+
 
 class IrHttp(models.AbstractModel):
     _inherit = "ir.http"
 
+    @classmethod
+    def _get_bonatapi_user(cls, access_token):
+        """User id of a valid ``access_token``, or ``None``.
+
+        The slow hash verification of ``_check_credentials`` is only done on
+        a cache miss. A cache hit is still checked against the database with
+        a cheap indexed query, so a revoked, expired or rotated key is
+        refused at once by every worker.
+        """
+        cache_key = (request.env.cr.dbname, hashlib.sha256(access_token.encode()).hexdigest())
+        cached = _api_key_cache.get(cache_key)
+        if cached:
+            user_id, index = cached
+            if request.env["res.users.apikeys"]._bonat_key_still_valid(user_id, index, scope=API_KEY_SCOPE):
+                return user_id
+            _api_key_cache.pop(cache_key)
+
+        user_id = request.env["res.users.apikeys"]._check_credentials(scope=API_KEY_SCOPE, key=access_token)
+        if user_id:
+            _api_key_cache.set(cache_key, (user_id, access_token[:INDEX_SIZE]))
+        return user_id
+
+    @classmethod
+    def _get_bonatapi_cache_stats(cls):
+        return _api_key_cache.stats()
+
+    @classmethod
+    def _clear_bonatapi_cache(cls, dbname):
+        _api_key_cache.pop_matching(lambda key: key[0] == dbname)
+
     @classmethod
     def _auth_method_bonatapi(cls):
         access_token = request.httprequest.headers.get('Authorization')
@@ -17,7 +56,7 @@ class IrHttp(models.AbstractModel):
         if access_token.startswith('Bearer '):
             access_token = access_token[7:]
 
-        user_id = request.env["res.users.apikeys"]._check_credentials(scope='odoo.restapi', key=access_token)
+        user_id = cls._get_bonatapi_user(access_token)
         if not user_id:
             raise BadRequest('Access token invalid')
 
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class PosCategory(models.Model):
+    _name = 'pos.category'
+    _inherit = ['pos.category', 'bonat.cache.mixin']
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['bonat.change']._record_changes(records)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['bonat.change']._record_changes(self)
+        return res
+
+    def unlink(self):
+        self.env['bonat.deleted.record']._record_deletion(self)
+        self.env['bonat.change']._record_changes(self)
+        return super().unlink()
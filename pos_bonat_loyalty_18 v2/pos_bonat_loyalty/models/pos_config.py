@@ -6,7 +6,8 @@ from odoo import fields, models
 
 
 class PosConfig(models.Model):
-    _inherit = 'pos.config'
+    _name = 'pos.config'
+    _inherit = ['pos.config', 'bonat.cache.mixin']
 
     bonat_discount_percentage_product_id = fields.Many2one('product.product',
                                                            string="Bonat Discount Product",
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+
+class PosOrder(models.Model):
+    _inherit = 'pos.order'
+
+    def init(self):
+        super().init()
+        # orders of a point of sale over a period, in the API listing order
+        create_index(self._cr, 'pos_order_bonat_config_date_order_index', self._table,
+                     ['config_id', 'date_order DESC', 'id DESC'])
+        create_index(self._cr, 'pos_order_bonat_pos_reference_index', self._table, ['pos_reference'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['bonat.change']._record_changes(records)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['bonat.change']._record_changes(self)
+        return res
+
+    def unlink(self):
+        self.env['bonat.deleted.record']._record_deletion(self)
+        self.env['bonat.change']._record_changes(self)
+        return super().unlink()
+
+    @api.model
+    def _get_bonat_summary_tz(self):
+        """Timezone of the date buckets of ``_get_bonat_sales_summary``."""
+        return self.env.context.get('tz') or self.env.user.tz or 'UTC'
+
+    @api.model
+    def _get_bonat_sales_summary(self, domain, interval='day', groupby=('date', 'config')):
+        """Totals of the orders matching ``domain``, aggregated in the database.
+
+        Returns the totals of the orders, of their lines per product and of
+        their payments per payment method, grouped by ``groupby``: ``date``
+        (the order date truncated to ``interval`` in the user timezone)
+        and/or ``config`` (the point of sale). Access rules apply to the
+        orders.
+        """
+        orders = self._search(domain)
+        dimensions = []
+        if 'date' in groupby:
+            tz = self._get_bonat_summary_tz()
+            dimensions.append(('date', SQL(
+                "date_trunc(%s, timezone(%s, timezone('UTC', o.date_order)))::date", interval, tz)))
+        if 'config' in groupby:
+            dimensions.append(('config_id', SQL("o.config_id")))
+
+        def aggregate(aggregates, from_clause, extra_dimensions=()):
+            columns = dimensions + list(extra_dimensions)
+            self.env.cr.execute(SQL(
+                "SELECT %s FROM %s WHERE o.id IN %s %s ORDER BY %s",
+                SQL(", ").join([SQL("%s AS %s", expr, SQL.identifier(name)) for name, expr in columns]
+                               + [SQL("%s AS %s", expr, SQL.identifier(name)) for name, expr in aggregates]),
+                from_clause,
+                orders.subselect(),
+                SQL("GROUP BY %s", SQL(", ").join(expr for name, expr in columns)) if columns else SQL(),
+                SQL(", ").join(SQL.identifier(name) for name, expr in columns) if columns else SQL("1"),
+            ))
+            rows = self.env.cr.dictfetchall()
+            for row in rows:
+                if row.get('date'):
+                    row['date'] = row['date'].isoformat()
+            return rows
+
+        # monetary and quantity columns are numeric: cast them to float for JSON
+        return {
+            'orders': aggregate([
+                ('order_count', SQL("COUNT(*)")),
+                ('amount_total', SQL("SUM(o.amount_total)::float")),
+                ('amount_tax', SQL("SUM(o.amount_tax)::float")),
+                ('amount_paid', SQL("SUM(o.amount_paid)::float")),
+            ], SQL("pos_order o")),
+            'products': aggregate([
+                ('line_count', SQL("COUNT(*)")),
+                ('qty', SQL("SUM(l.qty)::float")),
+                ('price_subtotal', SQL("SUM(l.price_subtotal)::float")),
+                ('price_subtotal_incl', SQL("SUM(l.price_subtotal_incl)::float")),
+            ], SQL("pos_order_line l JOIN pos_order o ON o.id = l.order_id"), [('product_id', SQL("l.product_id"))]),
+            'payment_methods': aggregate([
+                ('payment_count', SQL("COUNT(*)")),
+                ('amount', SQL("SUM(p.amount)::float")),
+            ], SQL("pos_payment p JOIN pos_order o ON o.id = p.pos_order_id"), [('payment_method_id', SQL("p.payment_method_id"))]),
+        }
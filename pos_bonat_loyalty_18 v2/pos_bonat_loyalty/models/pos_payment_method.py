@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class PosPaymentMethod(models.Model):
+    _name = 'pos.payment.method'
+    _inherit = ['pos.payment.method', 'bonat.cache.mixin']
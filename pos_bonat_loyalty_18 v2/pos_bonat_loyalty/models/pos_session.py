@@ -6,18 +6,37 @@ _logger = logging.getLogger(__name__)
 
 
 class PosSession(models.Model):
-    _inherit = "pos.session"
+    _name = "pos.session"
+    _inherit = ["pos.session", "bonat.cache.mixin"]
 
     # def _loader_params_res_company(self):
     #     res = super()._loader_params_res_company()
     #     res["search_params"]["fields"] += ["enable_bonat_integration", "bonat_api_key", "bonat_merchant_id", "bonat_merchant_name"]
     #     return res
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['bonat.change']._record_changes(records)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['bonat.change']._record_changes(self)
+        return res
+
+    def unlink(self):
+        self.env['bonat.deleted.record']._record_deletion(self)
+        self.env['bonat.change']._record_changes(self)
+        return super().unlink()
+
     @api.model
-    def pos_reward_redeem(self, redeem_data):
+    def pos_reward_redeem(self, redeem_data, deferred=False):
         """
         Handles the API call from POS for Bonat reward redemption.
         Validates the coupon and checks if it has already been used.
+        With ``deferred``, the redemption is queued in the Bonat outbox
+        and sent in the background instead.
         """
         _logger.info(f"Received Bonat Redeem Request redeem_data: {redeem_data}")
 
@@ -46,13 +65,6 @@ class PosSession(models.Model):
             _logger.warning("Bonat API key is missing.")
             return {"success": False, "error": "Bonat API key is missing."}
 
-        # Prepare API request
-        api_url = "https://api.bonat.io/odoo_partner/redeem"
-        # api_url = "https://stg-api.bonat.io/odoo_partner/redeem"
-        headers = {
-            "Authorization": f"Bearer {company.bonat_api_key}",
-            "Content-Type": "application/json",
-        }
         bonat_redeem_data = {
             "reward_code": reward_code,
             "merchant_id": merchant_id,
@@ -60,20 +72,30 @@ class PosSession(models.Model):
             "date": date,
             "timestamp": timestamp,
         }
+        Outbox = self.env['bonat.outbox']
+        redeem_key = Outbox._get_redeem_key(merchant_id, reward_code)
+        if deferred:
+            Outbox._enqueue('redeem', bonat_redeem_data, company, idempotency_key=redeem_key)
+            self.env['res.company']._invalidate_bonat_code_cache(reward_code)
+            return {"success": True, "queued": True}
+
+        # Prepare API request
+        client = company._get_bonat_client()
 
         # Log the API redeem_data
-        _logger.info(f"Sending request to Bonat API: {api_url}")
-        _logger.debug(f"Request Headers: {headers}")
+        _logger.info(f"Sending request to Bonat API: {client.get_url('redeem')}")
         _logger.debug(f"Request redeem_data: {bonat_redeem_data}")
 
         try:
             # Make the API call
-            response = requests.post(api_url, json=bonat_redeem_data, headers=headers, timeout=10)
+            response = client.post("redeem", bonat_redeem_data)
             # Check response status
             if response.status_code == 200:
                 data = response.json()
                 _logger.info(f"Bonat API Response reward redeem: {data}")
                 if data.get("code") == 0:  # Success response
+                    Outbox._record_delivered('redeem', bonat_redeem_data, company, redeem_key, data.get("data"))
+                    self.env['res.company']._invalidate_bonat_code_cache(reward_code)
                     return {"success": True, "data": data.get("data")}
                 else:
                     error_message = data.get("errors", "Invalid reward code.")
@@ -92,33 +114,17 @@ class PosSession(models.Model):
             return {"success": False, "error": f"Unexpected server error: {str(e)}"}
 
     @api.model
-    def pos_order_creation_request(self, order_creation_data):
-
+    def pos_order_creation_request(self, order_creation_data, idempotency_key=None):
+        """
+        Queue the ``order.created`` event for Bonat. Delivery happens in the
+        outbox cron, so checkout does not wait for the Bonat API.
+        ``idempotency_key`` (the POS order uuid) makes retries harmless.
+        """
         # Check company configuration
         company = self.env.company
         if not company.enable_bonat_integration or not company.bonat_api_key:
             return {"success": False, "error": "Bonat integration is not enabled or API key is missing."}
 
-        api_url = "https://api.bonat.io/odoo_partner/order"
-        # api_url = "https://stg-api.bonat.io/odoo_partner/order"
-        headers = {
-            "Authorization": f"Bearer {company.bonat_api_key}",
-            "Content-Type": "application/json",
-        }
-
-        try:
-            _logger.info(f"POS Order Data: {order_creation_data}")
-            response = requests.post(api_url, json=order_creation_data, headers=headers, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("code") == 0:  # Success response from Bonat
-                    return {"success": True, "data": data.get("data")}
-                else:
-                    return {"success": False, "error": data.get("errors", "Invalid code.")}
-            else:
-                return {"success": False, "error": f"API Error: {response.text}"}
-
-        except requests.exceptions.RequestException as e:
-            _logger.error(f"Bonat API Request Exception: {str(e)}")
-            return {"success": False}
+        _logger.info(f"POS Order Data: {order_creation_data}")
+        message = self.env['bonat.outbox']._enqueue('order', order_creation_data, company, idempotency_key=idempotency_key)
+        return {"success": True, "queued": True, "data": {"idempotency_key": message.idempotency_key}}
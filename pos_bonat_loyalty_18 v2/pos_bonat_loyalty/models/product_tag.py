@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class ProductTag(models.Model):
+    _name = 'product.tag'
+    _inherit = ['product.tag', 'bonat.cache.mixin']
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class ProductTemplate(models.Model):
+    _name = 'product.template'
+    _inherit = ['product.template', 'bonat.cache.mixin']
+
+    def write(self, vals):
+        res = super().write(vals)
+        # the API exports variants, which depend on their template
+        if self.env['bonat.change']._is_push_enabled():
+            self.env['bonat.change']._record_changes(self.with_context(active_test=False).product_variant_ids)
+        return res
+
+    def unlink(self):
+        # the variants are deleted by the database cascade, without going
+        # through product.product.unlink
+        variants = self.with_context(active_test=False).product_variant_ids
+        self.env['bonat.deleted.record']._record_deletion(variants)
+        self.env['bonat.change']._record_changes(variants)
+        return super().unlink()
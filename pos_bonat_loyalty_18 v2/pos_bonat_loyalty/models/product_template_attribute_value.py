@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class ProductTemplateAttributeValue(models.Model):
+    _name = 'product.template.attribute.value'
+    _inherit = ['product.template.attribute.value', 'bonat.cache.mixin']
@@ -2,10 +2,15 @@
 import logging
 import requests
 from odoo import api, models, fields, _
+from odoo.addons.pos_bonat_loyalty import bonat_client, const
+from odoo.addons.pos_bonat_loyalty.cache import TTLCache
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+# successful reward-check payloads by (database, merchant_id, code)
+_reward_check_cache = TTLCache(const.reward_check_cache_size, const.reward_check_cache_ttl)
+
 
 class ResCompany(models.Model):
     _inherit = 'res.company'
@@ -19,6 +24,28 @@ class ResCompany(models.Model):
     def _load_pos_data_fields(self, config_id):
         return super()._load_pos_data_fields(config_id) + ["enable_bonat_integration", "bonat_api_key", "bonat_merchant_id", "bonat_merchant_name"]
 
+    def _get_bonat_client(self):
+        """Client for the Bonat API, configurable through system parameters
+        (``pos_bonat_loyalty.api_url``, ``pos_bonat_loyalty.connect_timeout``
+        and ``pos_bonat_loyalty.read_timeout``)."""
+        self.ensure_one()
+        ICP = self.env['ir.config_parameter'].sudo()
+        return bonat_client.BonatClient(
+            self.bonat_api_key,
+            base_url=ICP.get_param('pos_bonat_loyalty.api_url', bonat_client.DEFAULT_BASE_URL),
+            connect_timeout=float(ICP.get_param('pos_bonat_loyalty.connect_timeout', bonat_client.DEFAULT_CONNECT_TIMEOUT)),
+            read_timeout=float(ICP.get_param('pos_bonat_loyalty.read_timeout', bonat_client.DEFAULT_READ_TIMEOUT)),
+        )
+
+    @api.model
+    def _invalidate_bonat_code_cache(self, code):
+        dbname = self.env.cr.dbname
+        _reward_check_cache.pop_matching(lambda key: key[0] == dbname and key[2] == code)
+
+    @api.model
+    def _get_bonat_code_cache_stats(self):
+        return _reward_check_cache.stats()
+
     @api.model
     def get_bonat_code_response(self, code):
         """
@@ -29,20 +56,23 @@ class ResCompany(models.Model):
         if not company.enable_bonat_integration or not company.bonat_api_key:
             return {"success": False, "error": _("Bonat integration is not enabled or API key is missing.")}
 
-        api_url = "https://api.bonat.io/odoo_partner/reward-check"
-        # api_url = "https://stg-api.bonat.io/odoo_partner/reward-check"
-        headers = {
-            "Authorization": f"Bearer {company.bonat_api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "reward_code": code,
             "merchant_id": company.bonat_merchant_id
         }
 
+        # A cached answer is only served while no redemption of the code is
+        # known, in this worker or (through the outbox journal) any other.
+        cache_key = (self.env.cr.dbname, company.bonat_merchant_id, code)
+        cached_data = _reward_check_cache.get(cache_key)
+        if cached_data is not None:
+            if not self.env['bonat.outbox']._is_redeemed(company.bonat_merchant_id, code):
+                return {"success": True, "data": cached_data}
+            _reward_check_cache.pop(cache_key)
+
         try:
             # Make API Request
-            response = requests.post(api_url, json=payload, headers=headers, timeout=10)
+            response = company._get_bonat_client().post("reward-check", payload)
             # import pdb;pdb.set_trace()
             if response.status_code == 200:
                 data = response.json()
@@ -50,6 +80,7 @@ class ResCompany(models.Model):
                     api_data = data.get("data")
                     # Add allowed_products to the API response data
                     # api_data["allowed_products"] = allowed_products
+                    _reward_check_cache.set(cache_key, api_data)
                     return {"success": True, "data": api_data}
                 else:
                     return {"success": False, "error": data.get("errors", "This code has already been used. Please try a different one.")}
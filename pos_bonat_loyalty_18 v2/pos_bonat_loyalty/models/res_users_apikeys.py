@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class ResUsersApikeys(models.Model):
+    _inherit = 'res.users.apikeys'
+
+    @api.model
+    def _bonat_key_still_valid(self, user_id, index, scope):
+        """Cheap check that the key verified earlier is still active (same
+        filters as ``_check_credentials``, without the hash verification)."""
+        self.env.cr.execute(f"""
+            SELECT 1
+              FROM {self._table} INNER JOIN res_users u ON (u.id = user_id)
+             WHERE u.active AND user_id = %s AND index = %s
+               AND (scope IS NULL OR scope = %s)
+               AND (expiration_date IS NULL OR expiration_date >= now() at time zone 'utc')
+             LIMIT 1
+        """, [user_id, index, scope])
+        return bool(self.env.cr.fetchone())
+
+    def unlink(self):
+        self.env['ir.http']._clear_bonatapi_cache(self.env.cr.dbname)
+        return super().unlink()
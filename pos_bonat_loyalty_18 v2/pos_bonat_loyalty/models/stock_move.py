@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class StockMove(models.Model):
+    _name = 'stock.move'
+    _inherit = ['stock.move', 'bonat.cache.mixin']
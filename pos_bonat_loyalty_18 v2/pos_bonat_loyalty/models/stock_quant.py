@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class StockQuant(models.Model):
+    _name = 'stock.quant'
+    _inherit = ['stock.quant', 'bonat.cache.mixin']
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class StockValuationLayer(models.Model):
+    _name = 'stock.valuation.layer'
+    _inherit = ['stock.valuation.layer', 'bonat.cache.mixin']
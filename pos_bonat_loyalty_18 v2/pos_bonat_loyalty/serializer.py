@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Serialization of ``search_read`` rows for the POS REST API.
+
+The conversions needed by a set of rows only depend on the model, the
+fields read and the relations to expand, so they are compiled once into a
+plan, cached per registry: serializing a row then copies it and converts
+only the dates, binaries and relations, without any field lookup.
+"""
+import json
+
+from werkzeug.urls import url_join
+
+from odoo.addons.pos_bonat_loyalty import const
+from odoo.tools import DEFAULT_SERVER_DATE_FORMAT, DEFAULT_SERVER_DATETIME_FORMAT
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# database name -> (registry, {(model, fields, relations, count fields): plan}),
+# the plans are dropped when the registry is reloaded
+_plans = {}
+# plans kept per registry, the field lists come from request parameters
+MAX_PLANS = 256
+
+
+def dumps(data):
+    """Encode ``data`` as JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+class SerializerPlan:
+    """Converters of one row layout.
+
+    ``converters`` holds ``(field_name, convert, always)`` for each field
+    needing a conversion: ``convert(value, row, context)`` is called for
+    truthy values only, unless ``always`` is set. ``relations`` maps the
+    expanded fields to ``(type, comodel, comodel_fields)``, and
+    ``has_images`` tells whether binary fields are exported as URLs.
+    """
+
+    def __init__(self, converters, relations, has_images=False):
+        self.converters = converters
+        self.relations = relations
+        self.has_images = has_images
+
+
+def _convert_date(value, row, context):
+    return value.strftime(DEFAULT_SERVER_DATE_FORMAT)
+
+
+def _convert_datetime(value, row, context):
+    return value.strftime(DEFAULT_SERVER_DATETIME_FORMAT)
+
+
+def _convert_count(value, row, context):
+    return len(value)
+
+
+def _image_converter(model, field_name):
+    path = '/api/image/%s/%%d/%s' % (model, field_name)
+
+    def convert(value, row, context):
+        url = url_join(context['base_url'], path % row['id'])
+        unique = context['image_versions'].get(row['id'])
+        if unique:
+            # changes with the image, so it can be cached for good
+            url += '?unique=%s' % unique.strftime('%Y%m%d%H%M%S')
+        return url
+    return convert
+
+
+def _many2one_converter(field_name):
+    def convert(value, row, context):
+        return context['related'][field_name].get(value[0], value)
+    return convert
+
+
+def _x2many_converter(field_name):
+    def convert(value, row, context):
+        lookup = context['related'][field_name]
+        return [lookup[res_id] for res_id in sorted(value) if res_id in lookup]
+    return convert
+
+
+def _compile_plan(env, model, fields, relation_fields, count_fields):
+    model_fields = env[model]._fields
+    converters = []
+    relations = {}
+    has_images = False
+    for field_name in fields:
+        field = model_fields.get(field_name)
+        if field is None:
+            continue
+        if field_name in count_fields:
+            converters.append((field_name, _convert_count, True))
+        elif field_name in relation_fields:
+            relations[field_name] = (field.type, field.comodel_name, relation_fields[field_name])
+            if field.type == 'many2one':
+                converters.append((field_name, _many2one_converter(field_name), False))
+            else:
+                converters.append((field_name, _x2many_converter(field_name), False))
+        elif field.type == 'date':
+            converters.append((field_name, _convert_date, False))
+        elif field.type == 'datetime':
+            converters.append((field_name, _convert_datetime, False))
+        elif field.type == 'binary':
+            converters.append((field_name, _image_converter(model, field_name), False))
+            has_images = True
+    return SerializerPlan(converters, relations, has_images)
+
+
+def get_plan(env, model, fields, relation_fields=None, count_fields=()):
+    relation_fields = relation_fields or {}
+    key = (
+        model,
+        tuple(fields),
+        tuple((field_name, tuple(comodel_fields)) for field_name, comodel_fields in relation_fields.items()),
+        frozenset(count_fields),
+    )
+    registry, plans = _plans.get(env.registry.db_name, (None, None))
+    if registry is not env.registry:
+        plans = {}
+        _plans[env.registry.db_name] = (env.registry, plans)
+    plan = plans.get(key)
+    if plan is None:
+        if len(plans) >= MAX_PLANS:
+            plans.clear()
+        plan = plans[key] = _compile_plan(env, model, fields, relation_fields, count_fields)
+    return plan
+
+
+def get_image_versions(env, model, ids):
+    """``{id: newest write date}`` of the records ``ids`` and of the records
+    their images fall back on, e.g. the template of a product (see
+    ``const.delta_write_date_fields``), in a constant number of queries."""
+    paths = const.delta_write_date_fields.get(model, ['write_date'])
+    versions = {}
+    for record in env[model].browse(ids):
+        dates = [write_date for path in paths for write_date in record.mapped(path) if write_date]
+        versions[record.id] = max(dates, default=None)
+    return versions
+
+
+def prefetch_related(env, plan, records, base_url):
+    """Read every comodel referenced by ``records`` in a single query.
+
+    Returns ``{field_name: {id: row}}`` so the rows can be resolved in
+    memory instead of one query per record.
+    """
+    related = {}
+    for field_name, (field_type, comodel, comodel_fields) in plan.relations.items():
+        ids = set()
+        for record in records:
+            value = record[field_name]
+            if not value:
+                continue
+            if field_type == 'many2one':
+                ids.add(value[0])
+            else:
+                ids.update(value)
+        rows = []
+        if ids:
+            rows = env[comodel].search_read([('id', 'in', list(ids))], comodel_fields, order="id")
+            rows = serialize_records(env, comodel, rows, base_url=base_url)
+        related[field_name] = {row['id']: row for row in rows}
+    return related
+
+
+def serialize_records(env, model, records, m2o_fields=None, m2m_fields=None, o2m_fields=None, count_fields=(), base_url=None):
+    """Convert ``search_read`` rows of ``model`` to JSON-ready dicts.
+
+    Relational fields listed in ``m2o_fields``, ``m2m_fields`` and
+    ``o2m_fields`` are expanded to the comodel rows, which are fetched
+    once for the whole result set. The x2many fields in ``count_fields``
+    are replaced by the number of linked records. Binary fields become
+    ``/api/image`` URLs under ``base_url``, versioned by ``get_image_versions``.
+    """
+    if not records:
+        return []
+    relation_fields = dict(m2o_fields or {}, **(m2m_fields or {}), **(o2m_fields or {}))
+    # all the rows of a search_read have the same keys
+    plan = get_plan(env, model, list(records[0]), relation_fields, count_fields)
+    context = {
+        'base_url': base_url,
+        'related': prefetch_related(env, plan, records, base_url),
+        'image_versions': get_image_versions(env, model, [row['id'] for row in records]) if plan.has_images else {},
+    }
+    converters = plan.converters
+    data = []
+    for row in records:
+        rec = dict(row)
+        for field_name, convert, always in converters:
+            value = row[field_name]
+            if value or always:
+                rec[field_name] = convert(value, row, context)
+        data.append(rec)
+    return data
@@ -62,11 +62,7 @@ patch(ControlButtons.prototype, {
                     product_id: line.get_product().id,
                     quantity: line.get_quantity(),
                 }));
-                const response = await this.pos.data.call(
-                    "res.company",
-                    "get_bonat_code_response",
-                    [trimmedCode]
-                );
+                const response = await this.pos.getBonatCodeResponse(trimmedCode);
 
                 console.log("\n\n\n\n\n >>>>>>>>>>> reward code check response:", response);
                 if (response.success) {
@@ -114,11 +110,7 @@ patch(ControlButtons.prototype, {
                                     date: new Date().toISOString(), // Current date (YYYY-MM-DD)
                                     timestamp: Math.floor(Date.now() / 1000), // Current timestamp (ISO 8601 format)
                                 };
-                                const data = await this.pos.data.call(
-                                    "pos.session",
-                                    "pos_reward_redeem",
-                                    [redeem_data],
-                                );
+                                const data = await this.pos.redeemBonatCode(redeem_data);
                                 // if (!data.success) {
                                 //     this.dialog.add(AlertDialog, {
                                 //         title: _t("Error validating"),
@@ -132,18 +124,7 @@ patch(ControlButtons.prototype, {
                         const isPercentage = response.data.is_percentage || false;
                         const orderlines = order.get_orderlines();
                         const productIds = response.data.allowed_products.product_id;
-                        const productDetails = await this.pos.data.call(
-                            "product.product",
-                            "search_read",
-                            [
-                                [
-                                    ["id", "in", productIds]
-                                ]
-                            ], { fields: ["id", "display_name"] }
-                        );
-                        productDetails.forEach(product => {
-                            product.display_name = product.display_name.replace(/\[.*?\]/, '').trim();
-                        });
+                        const productDetails = await this.pos.getBonatProductDetails(productIds);
                         let allowedQty = response.data.allowed_products.quantity
                         let discountAmount = response.data.discount_amount || 0;
                         let maxDiscountAmt = response.data.max_discount_amount || 0;
@@ -167,11 +148,7 @@ patch(ControlButtons.prototype, {
                                     date: new Date().toISOString(), // Current date (YYYY-MM-DD)
                                     timestamp: Math.floor(Date.now() / 1000), // Current timestamp (ISO 8601 format)
                                 };
-                                const data = await this.pos.data.call(
-                                    "pos.session",
-                                    "pos_reward_redeem",
-                                    [redeem_data],
-                                );
+                                const data = await this.pos.redeemBonatCode(redeem_data);
                                 // if (!data.success) {
                                 //     this.dialog.add(AlertDialog, {
                                 //         title: _t("Error validating"),
@@ -180,10 +157,11 @@ patch(ControlButtons.prototype, {
                                 // }
                             }
 
+                            const linesByProduct = order.get_bonat_lines_by_product();
                             for (const popupProduct of payload) {
                                 const productId = popupProduct.product_id.toString();
                                 const selectedQty = popupProduct.quantity || 0;
-                                const existingLine = order.get_orderlines().find((line) => line.get_product().id.toString() === productId);
+                                const existingLine = linesByProduct.get(productId);
 
                                 if (!existingLine && selectedQty > 0) {
                                     const product = this.pos.models["product.product"].get(productId);
@@ -207,14 +185,20 @@ patch(ControlButtons.prototype, {
                             let totalDiscountApplied = 0;
                             let percentage_disc_applied = false;
                             let allowedQty = response.data.allowed_products.quantity || 0;
+                            const selectedQtyByProduct = new Map();
+                            for (const product of payload) {
+                                const productId = product.product_id.toString();
+                                if (!selectedQtyByProduct.has(productId)) {
+                                    selectedQtyByProduct.set(productId, product.quantity || 0);
+                                }
+                            }
+                            const allowedProducts = new Set(response.data.allowed_products.product_id || []); // Allowed product IDs
                             order.get_orderlines().forEach((line) => {
                                 const productId = line.get_product().id.toString();
                                 const quantity = line.get_quantity();
-                                const selectedQty = payload.find(product => product.product_id.toString() === productId)?.quantity || 0;
-                                // const selectedQty = payload.updatedProducts.find(product => product.product_id.toString() === productId)?.quantity || 0;
-                                const allowedProducts = response.data.allowed_products.product_id || []; // Allowed product IDs
+                                const selectedQty = selectedQtyByProduct.get(productId) || 0;
 
-                                if (allowedProducts.includes(productId) && selectedQty > 0) {
+                                if (allowedProducts.has(productId) && selectedQty > 0) {
                                     
                                     line.set_discountAmount(discountAmount);
                                     line.set_isPercentage(isPercentage);
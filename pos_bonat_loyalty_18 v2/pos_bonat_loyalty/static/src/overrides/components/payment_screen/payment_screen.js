@@ -124,18 +124,24 @@ patch(PaymentScreen.prototype, {
         //         });
         //     }
         // }
-        await this._finalizeOrderCreation(order_creation_data);
+        await this._finalizeOrderCreation(order_creation_data, order.uuid);
         await super.validateOrder(...arguments);
     },
 
-    async _finalizeOrderCreation(order_creation_data) {
-        const response = await this.pos.data.call(
-            "pos.session",
-            "pos_order_creation_request",
-            [order_creation_data]
-        );
-        if (response.success) {
-            console.log("Order creation success:", response);
+    async _finalizeOrderCreation(order_creation_data, idempotency_key) {
+        // The server only queues the event in the Bonat outbox, a failure
+        // here must never prevent the cashier from validating the order.
+        try {
+            const response = await this.pos.data.call(
+                "pos.session",
+                "pos_order_creation_request",
+                [order_creation_data, idempotency_key]
+            );
+            if (response.success) {
+                console.log("Order creation queued:", response);
+            }
+        } catch (error) {
+            console.warn("Bonat order creation could not be queued:", error);
         }
     }
 });
\ No newline at end of file
@@ -9,127 +9,196 @@ import { parseUTCString, qrCodeSrc, random5Chars, uuidv4, gte, lt } from "@point
 import { floatIsZero, roundPrecision } from "@web/core/utils/numbers";
 // import { computeComboItems } from "./utils/compute_combo_items";
 import { accountTaxHelpers } from "@account/helpers/account_tax";
+import { toRaw } from "@odoo/owl";
+
+// Per order: cached base lines by line uuid, and the last tax summary.
+const bonatTaxCaches = new WeakMap();
+
+function getBonatTaxCache(order) {
+    const rawOrder = toRaw(order);
+    let cache = bonatTaxCaches.get(rawOrder);
+    if (!cache) {
+        cache = { lines: new Map(), summaryKey: null, summary: null };
+        bonatTaxCaches.set(rawOrder, cache);
+    }
+    return cache;
+}
 
 patch(PosOrder.prototype, {
-	/**
-     * Get the details total amounts with and without taxes, the details of taxes per subtotal and per tax group.
-     * @returns See '_get_tax_totals_summary' in account_tax.py for the full details.
+    /**
+     * Signature of everything the Bonat split and the taxes of ``line`` depend on.
      */
-    get taxTotals() {
-        const currency = this.config.currency_id;
-        const company = this.company;
-        const orderLines = this.lines;
+    _getBonatLineSignature(line, documentSign) {
+        return JSON.stringify([
+            documentSign,
+            line.qty,
+            line.get_unit_price(),
+            line.get_discount(),
+            line.product_id.id,
+            line.tax_ids.map((tax) => tax.id),
+            this.fiscal_position_id?.id,
+            line.get_response_data_type_2(),
+            line.get_isPercentage(),
+            line.get_percentage_partial_discount(),
+            line.get_fix_amt_partial_disc(),
+            line.get_discountAmount(),
+            line.get_allowedQty(),
+            line.get_maxDiscountAmt(),
+        ]);
+    },
+    /**
+     * Base lines of ``line`` with their (unrounded) tax details, split between
+     * the Bonat discounted quantity and the regular one for partial discounts.
+     */
+    _computeBonatLineBaseLines(line, documentSign) {
+        const response_data_type_2 = line.get_response_data_type_2();
+        const isPercentage = line.get_isPercentage();
+        const percentage_partial_discount = line.get_percentage_partial_discount();
+        const discountAmount = line.get_discountAmount();
+        const allowedQty = line.get_allowedQty();
+        const price_unit = line.get_unit_price();
+        const maxDiscountAmt = line.get_maxDiscountAmt();
+        const fix_amt_partial_disc = line.get_fix_amt_partial_disc();
+        if (response_data_type_2 && isPercentage && percentage_partial_discount) {
+            if (line.qty > allowedQty) {
+                let discountForApplicableQty = (discountAmount / 100) * price_unit * allowedQty;
 
-        // If each line is negative, we assume it's a refund order.
-        // It's a normal order if it doesn't contain a line (useful for pos_settle_due).
-        // TODO: Properly differentiate refund orders from normal ones.
-        const documentSign =
-            this.lines.length === 0 ||
-            !this.lines.every((l) => lt(l.qty, 0, { decimals: currency.decimal_places }))
-                ? 1
-                : -1;
-        let baseLines = [];
-        orderLines.forEach((line) => {
-            const response_data_type_2 = line.get_response_data_type_2();
-            const isPercentage = line.get_isPercentage();
-            const percentage_partial_discount = line.get_percentage_partial_discount();
-            const discountAmount = line.get_discountAmount();
-            const allowedQty = line.get_allowedQty();
-            const price_unit = line.get_unit_price();
-            const maxDiscountAmt = line.get_maxDiscountAmt();
-            const fix_amt_partial_disc = line.get_fix_amt_partial_disc();
-            if (response_data_type_2 && isPercentage && percentage_partial_discount) {
-                if (line.qty > allowedQty) {
-                    let discountForApplicableQty = (discountAmount / 100) * price_unit * allowedQty;
-
-                    if (discountForApplicableQty > maxDiscountAmt) {
-                        discountForApplicableQty = maxDiscountAmt;
-                    }
-                    const discountedUnitPrice = price_unit - (discountForApplicableQty / allowedQty);
+                if (discountForApplicableQty > maxDiscountAmt) {
+                    discountForApplicableQty = maxDiscountAmt;
+                }
+                const discountedUnitPrice = price_unit - (discountForApplicableQty / allowedQty);
 
-                    const remainingQty = line.qty - allowedQty;
-                    const discountedBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
-                        line,
-                        line.prepareBaseLineForTaxesComputationExtraValues({
-                            quantity: documentSign * allowedQty,
-                            price_unit: discountedUnitPrice, // Adjusted price instead of using discount field
-                        })
-                    );
+                const remainingQty = line.qty - allowedQty;
+                const discountedBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
+                    line,
+                    line.prepareBaseLineForTaxesComputationExtraValues({
+                        quantity: documentSign * allowedQty,
+                        price_unit: discountedUnitPrice, // Adjusted price instead of using discount field
+                    })
+                );
+
+                const regularBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
+                    line,
+                    line.prepareBaseLineForTaxesComputationExtraValues({
+                        quantity: documentSign * remainingQty,
+                        price_unit: price_unit,
+                        discount: 0, // No discount on remaining qty
+                    })
+                );
 
-                    const regularBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
+                return [discountedBaseLine, regularBaseLine];
+            } else {
+                return [
+                    accountTaxHelpers.prepare_base_line_for_taxes_computation(
                         line,
                         line.prepareBaseLineForTaxesComputationExtraValues({
-                            quantity: documentSign * remainingQty,
-                            price_unit: price_unit,
-                            discount: 0, // No discount on remaining qty
+                            quantity: documentSign * line.qty,
                         })
-                    );
-
-                    baseLines.push(discountedBaseLine, regularBaseLine);
-                } else {
-                    baseLines.push(
-                        accountTaxHelpers.prepare_base_line_for_taxes_computation(
-                            line,
-                            line.prepareBaseLineForTaxesComputationExtraValues({
-                                quantity: documentSign * line.qty,
-                            })
-                        )
-                    );
-                }
+                    )
+                ];
             }
-             else if (response_data_type_2 && !isPercentage && fix_amt_partial_disc){
-                if (line.qty > allowedQty) {
-                    const totalDiscount = Math.min(discountAmount * allowedQty, maxDiscountAmt); // Cap discount at maxDiscountAmt
-                    const discountedUnitPrice = price_unit - (totalDiscount / allowedQty); // Apply discount evenly across allowedQty
+        }
+         else if (response_data_type_2 && !isPercentage && fix_amt_partial_disc){
+            if (line.qty > allowedQty) {
+                const totalDiscount = Math.min(discountAmount * allowedQty, maxDiscountAmt); // Cap discount at maxDiscountAmt
+                const discountedUnitPrice = price_unit - (totalDiscount / allowedQty); // Apply discount evenly across allowedQty
 
-                    const remainingQty = line.qty - allowedQty;
+                const remainingQty = line.qty - allowedQty;
 
-                    // debugger;
-                    const discountedBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
-                        line,
-                        line.prepareBaseLineForTaxesComputationExtraValues({
-                            quantity: documentSign * allowedQty,
-                            price_unit: discountedUnitPrice, // Adjusted price per unit for allowedQty
-                        })
-                    );
+                // debugger;
+                const discountedBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
+                    line,
+                    line.prepareBaseLineForTaxesComputationExtraValues({
+                        quantity: documentSign * allowedQty,
+                        price_unit: discountedUnitPrice, // Adjusted price per unit for allowedQty
+                    })
+                );
 
-                    const regularBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
-                        line,
-                        line.prepareBaseLineForTaxesComputationExtraValues({
-                            quantity: documentSign * remainingQty,
-                            price_unit: price_unit, // No discount for remaining qty
-                        })
-                    );
+                const regularBaseLine = accountTaxHelpers.prepare_base_line_for_taxes_computation(
+                    line,
+                    line.prepareBaseLineForTaxesComputationExtraValues({
+                        quantity: documentSign * remainingQty,
+                        price_unit: price_unit, // No discount for remaining qty
+                    })
+                );
 
-                    baseLines.push(discountedBaseLine, regularBaseLine);
-                } else {
-                    const discountedUnitPrice = line.get_unit_price() * (1.0 - line.get_discount() / 100.0); // Apply full discount
-
-                    baseLines.push(
-                        accountTaxHelpers.prepare_base_line_for_taxes_computation(
-                            line,
-                            line.prepareBaseLineForTaxesComputationExtraValues({
-                                quantity: documentSign * line.qty,
-                                price_unit: discountedUnitPrice,
-                            })
-                        )
-                    );
-                }
-            } 
-            else {
-                // Default calculation
-                baseLines.push(
+                return [discountedBaseLine, regularBaseLine];
+            } else {
+                const discountedUnitPrice = line.get_unit_price() * (1.0 - line.get_discount() / 100.0); // Apply full discount
+
+                return [
                     accountTaxHelpers.prepare_base_line_for_taxes_computation(
                         line,
                         line.prepareBaseLineForTaxesComputationExtraValues({
                             quantity: documentSign * line.qty,
+                            price_unit: discountedUnitPrice,
                         })
                     )
-                );
+                ];
+            }
+        } 
+        else {
+            // Default calculation
+            return [
+                accountTaxHelpers.prepare_base_line_for_taxes_computation(
+                    line,
+                    line.prepareBaseLineForTaxesComputationExtraValues({
+                        quantity: documentSign * line.qty,
+                    })
+                )
+            ];
+        }
+    },
+    /**
+     * Cached ``_computeBonatLineBaseLines``: the base lines of a line are only
+     * rebuilt, and its taxes recomputed, when its signature changes.
+     */
+    _getBonatLineBaseLines(line, documentSign, lineCache) {
+        const signature = this._getBonatLineSignature(line, documentSign);
+        const cached = lineCache.get(line.uuid);
+        if (cached && cached.signature === signature) {
+            return cached;
+        }
+        const baseLines = this._computeBonatLineBaseLines(line, documentSign);
+        accountTaxHelpers.add_tax_details_in_base_lines(baseLines, this.company);
+        const entry = { signature, baseLines };
+        lineCache.set(line.uuid, entry);
+        return entry;
+    },
+	/**
+     * Get the details total amounts with and without taxes, the details of taxes per subtotal and per tax group.
+     * @returns See '_get_tax_totals_summary' in account_tax.py for the full details.
+     */
+    get taxTotals() {
+        const currency = this.config.currency_id;
+        const company = this.company;
+        const orderLines = this.lines;
+
+        // If each line is negative, we assume it's a refund order.
+        // It's a normal order if it doesn't contain a line (useful for pos_settle_due).
+        // TODO: Properly differentiate refund orders from normal ones.
+        const documentSign =
+            this.lines.length === 0 ||
+            !this.lines.every((l) => lt(l.qty, 0, { decimals: currency.decimal_places }))
+                ? 1
+                : -1;
+        // Caches live outside of the reactive order so reading the getter
+        // never triggers a render.
+        const cache = getBonatTaxCache(this);
+        const liveUuids = new Set();
+        const signatures = [];
+        let baseLines = [];
+        for (const line of orderLines) {
+            const entry = this._getBonatLineBaseLines(line, documentSign, cache.lines);
+            liveUuids.add(line.uuid);
+            signatures.push(entry.signature);
+            baseLines.push(...entry.baseLines);
+        }
+        for (const uuid of [...cache.lines.keys()]) {
+            if (!liveUuids.has(uuid)) {
+                cache.lines.delete(uuid);
             }
-        });
-        accountTaxHelpers.add_tax_details_in_base_lines(baseLines, company);
-        accountTaxHelpers.round_base_lines_tax_details(baseLines, company);
+        }
 
         // For the generic 'get_tax_totals_summary', we only support the cash rounding that round the whole document.
         const cashRounding =
@@ -137,9 +206,16 @@ patch(PosOrder.prototype, {
                 ? this.config.rounding_method
                 : null;
 
-        const taxTotals = accountTaxHelpers.get_tax_totals_summary(baseLines, currency, company, {
-            cash_rounding: cashRounding,
-        });
+        const summaryKey = JSON.stringify([currency.id, cashRounding?.id, signatures]);
+        let taxTotals = cache.summaryKey === summaryKey ? cache.summary : null;
+        if (!taxTotals) {
+            accountTaxHelpers.round_base_lines_tax_details(baseLines, company);
+            taxTotals = accountTaxHelpers.get_tax_totals_summary(baseLines, currency, company, {
+                cash_rounding: cashRounding,
+            });
+            cache.summaryKey = summaryKey;
+            cache.summary = taxTotals;
+        }
 
         taxTotals.order_sign = documentSign;
         taxTotals.order_total =
@@ -55,6 +55,19 @@ patch(PosOrder.prototype, {
     get_bonat_merchant_name() {
         return this.bonat_merchant_name;
     },
+    /**
+     * Index of the order lines by product id (as string), first line wins.
+     */
+    get_bonat_lines_by_product() {
+        const linesByProduct = new Map();
+        for (const line of this.get_orderlines()) {
+            const productId = line.get_product().id.toString();
+            if (!linesByProduct.has(productId)) {
+                linesByProduct.set(productId, line);
+            }
+        }
+        return linesByProduct;
+    },
 });
 
 patch(PosOrderline.prototype, {
@@ -0,0 +1,84 @@
+/** @odoo-module */
+
+import { PosStore } from "@point_of_sale/app/store/pos_store";
+import { patch } from "@web/core/utils/patch";
+
+// Successful reward-check answers kept in the POS, per code and merchant.
+const BONAT_CODE_CACHE_SIZE = 50;
+const BONAT_CODE_CACHE_TTL = 60 * 1000;
+
+patch(PosStore.prototype, {
+    _getBonatCodeCache() {
+        if (!this.bonatCodeCache) {
+            this.bonatCodeCache = new Map();
+        }
+        return this.bonatCodeCache;
+    },
+    async getBonatCodeResponse(code) {
+        const cache = this._getBonatCodeCache();
+        const key = `${this.company.bonat_merchant_id}|${code}`;
+        const entry = cache.get(key);
+        cache.delete(key);
+        if (entry && entry.expiresAt > Date.now()) {
+            // re-insert to keep the Map ordered from least to most recently used
+            cache.set(key, entry);
+            return entry.response;
+        }
+        const response = await this.data.call("res.company", "get_bonat_code_response", [code]);
+        if (response.success) {
+            cache.set(key, { response, expiresAt: Date.now() + BONAT_CODE_CACHE_TTL });
+            if (cache.size > BONAT_CODE_CACHE_SIZE) {
+                cache.delete(cache.keys().next().value);
+            }
+        }
+        return response;
+    },
+    invalidateBonatCode(code) {
+        const cache = this._getBonatCodeCache();
+        for (const key of [...cache.keys()]) {
+            if (key.endsWith(`|${code}`)) {
+                cache.delete(key);
+            }
+        }
+    },
+    /**
+     * `{ id, display_name }` of the given products for the Bonat popup, taken
+     * from the products loaded in the POS. Only the products that are not
+     * loaded are fetched from the server, in a single call.
+     */
+    async getBonatProductDetails(productIds) {
+        const productModel = this.models["product.product"];
+        const details = new Map();
+        const missingIds = [];
+        for (const productId of productIds) {
+            const product = productModel.get(parseInt(productId, 10));
+            if (product) {
+                details.set(product.id, { id: product.id, display_name: product.display_name });
+            } else {
+                missingIds.push(parseInt(productId, 10));
+            }
+        }
+        if (missingIds.length) {
+            const products = await this.data.call(
+                "product.product",
+                "search_read",
+                [[["id", "in", missingIds]]],
+                { fields: ["id", "display_name"] }
+            );
+            for (const product of products) {
+                details.set(product.id, product);
+            }
+        }
+        return [...details.values()].map((product) => ({
+            id: product.id,
+            display_name: product.display_name.replace(/\[.*?\]/, "").trim(),
+        }));
+    },
+    async redeemBonatCode(redeem_data) {
+        const data = await this.data.call("pos.session", "pos_reward_redeem", [redeem_data]);
+        if (data.success) {
+            this.invalidateBonatCode(redeem_data.reward_code);
+        }
+        return data;
+    },
+});
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from . import test_api_key_cache
+from . import test_bonat_client
+from . import test_cache
+from . import test_change_push
+from . import test_delta_sync
+from . import test_export
+from . import test_filters
+from . import test_image
+from . import test_metrics
+from . import test_multi_get
+from . import test_orders_summary
+from . import test_outbox
+from . import test_pagination
+from . import test_prefetch
+from . import test_projection
+from . import test_response_cache
+from . import test_reward_check
+from . import test_serializer
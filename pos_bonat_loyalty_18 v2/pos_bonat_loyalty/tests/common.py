@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import Command, fields
+from odoo.addons.pos_bonat_loyalty.controllers import main
+from odoo.addons.pos_bonat_loyalty.models.ir_http import API_KEY_SCOPE
+from odoo.tests import HttpCase
+
+
+class BonatApiCase(HttpCase):
+    """Calls the POS REST API with an API key of the administrator."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.api_user = cls.env.ref('base.user_admin')
+        cls.api_key = cls.env['res.users.apikeys'].with_user(cls.api_user)._generate(
+            API_KEY_SCOPE, 'Bonat test', fields.Datetime.now() + timedelta(days=1))
+
+    def setUp(self):
+        super().setUp()
+        main._response_cache.clear()
+
+    def api_get(self, path, headers=None, **kwargs):
+        headers = dict(headers or {}, Authorization='Bearer %s' % self.api_key)
+        return self.url_open(path, headers=headers, **kwargs)
+
+
+class BonatPosApiCase(BonatApiCase):
+    """API tests over POS orders, created directly with the ORM in an open
+    session of a point of sale of their own."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pos_product = cls.env['product.product'].create({'name': 'Test POS Product', 'available_in_pos': True})
+        cls.pos_config, cls.pos_session = cls.create_session('Test Bonat POS')
+
+    @classmethod
+    def create_session(cls, name):
+        config = cls.env['pos.config'].create({'name': name})
+        return config, cls.env['pos.session'].create({'config_id': config.id, 'user_id': cls.env.uid})
+
+    @classmethod
+    def create_order(cls, date_order, price_unit=10, qty=1, session=None, state='paid'):
+        amount = price_unit * qty
+        return cls.env['pos.order'].create({
+            'session_id': (session or cls.pos_session).id,
+            'date_order': date_order,
+            'lines': [Command.create({
+                'product_id': cls.pos_product.id,
+                'full_product_name': cls.pos_product.name,
+                'qty': qty,
+                'price_unit': price_unit,
+                'price_subtotal': amount,
+                'price_subtotal_incl': amount,
+            })],
+            'amount_tax': 0,
+            'amount_total': amount,
+            'amount_paid': amount,
+            'amount_return': 0,
+            'state': state,
+        })
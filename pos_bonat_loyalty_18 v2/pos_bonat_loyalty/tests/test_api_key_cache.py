@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.pos_bonat_loyalty.models import ir_http
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import tagged
+
+PATH = '/api/pos/categories?fields=name'
+
+
+@tagged('post_install', '-at_install')
+class TestApiKeyCache(BonatApiCase):
+
+    def setUp(self):
+        super().setUp()
+        ir_http._api_key_cache.clear()
+        self.addCleanup(ir_http._api_key_cache.clear)
+        self.key_record = self.env['res.users.apikeys'].search([('name', '=', 'Bonat test')])
+
+    def test_authentication(self):
+        self.assertEqual(self.url_open(PATH).status_code, 400)
+        self.assertEqual(self.url_open(PATH, headers={'Authorization': 'Bearer invalid'}).status_code, 400)
+        self.assertEqual(self.api_get(PATH).status_code, 200)
+
+    def test_verified_key_cached(self):
+        self.api_get(PATH)
+        stats = ir_http._api_key_cache.stats()
+        self.assertEqual((stats['size'], stats['hits']), (1, 0))
+        self.assertEqual(self.api_get(PATH).status_code, 200)
+        self.assertEqual(ir_http._api_key_cache.stats()['hits'], 1)
+
+    def test_revoked_key_refused_on_cache_hit(self):
+        self.assertEqual(self.api_get(PATH).status_code, 200)
+        # deleted behind the ORM, as by another worker: the cache still holds it
+        self.env.cr.execute("DELETE FROM res_users_apikeys WHERE id = %s", [self.key_record.id])
+        self.assertEqual(len(ir_http._api_key_cache), 1)
+        self.assertEqual(self.api_get(PATH).status_code, 400)
+        self.assertEqual(len(ir_http._api_key_cache), 0)
+
+    def test_expired_key_refused_on_cache_hit(self):
+        self.assertEqual(self.api_get(PATH).status_code, 200)
+        self.env.cr.execute("UPDATE res_users_apikeys SET expiration_date = now() at time zone 'utc' - interval '1 day' WHERE id = %s",
+                            [self.key_record.id])
+        self.assertEqual(self.api_get(PATH).status_code, 400)
+
+    def test_unlink_clears_cache(self):
+        self.api_get(PATH)
+        self.key_record.unlink()
+        self.assertEqual(len(ir_http._api_key_cache), 0)
+        self.assertEqual(self.api_get(PATH).status_code, 400)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.addons.pos_bonat_loyalty import bonat_client, metrics
+from odoo.addons.pos_bonat_loyalty.benchmark.stub_server import BonatStubServer
+from odoo.tests import BaseCase
+
+
+class TestCircuitBreaker(BaseCase):
+
+    def test_opens_after_threshold(self):
+        breaker = bonat_client.CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+    def test_success_resets_failures(self):
+        breaker = bonat_client.CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow(), "only consecutive failures open the circuit")
+
+    def test_half_open_trial(self):
+        breaker = bonat_client.CircuitBreaker('test', failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        breaker.opened_at -= 60
+        self.assertTrue(breaker.allow(), "a trial call goes through after reset_timeout")
+        self.assertFalse(breaker.allow(), "a single trial call goes through")
+        breaker.record_failure()
+        self.assertFalse(breaker.allow(), "a failed trial opens the circuit again")
+        breaker.opened_at -= 60
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow(), "a successful trial closes the circuit")
+
+
+class TestBonatClient(BaseCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = BonatStubServer().start()
+        cls.addClassCleanup(cls.stub.stop)
+
+    def setUp(self):
+        super().setUp()
+        self.stub.reset()
+        bonat_client._breakers.clear()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.client = bonat_client.BonatClient('test-key', base_url=self.stub.url + '/odoo_partner/')
+
+    def test_post(self):
+        response = self.client.post('order', {'order_id': 'A1'}, headers={'Idempotency-Key': 'key-1'})
+        self.assertEqual(response.json(), {'code': 0, 'data': {'id': 'A1'}})
+        endpoint, headers, body = self.stub.received[0]
+        self.assertEqual(endpoint, 'order')
+        self.assertEqual(headers['Authorization'], 'Bearer test-key')
+        self.assertEqual(headers['Idempotency-Key'], 'key-1')
+        self.assertEqual(json.loads(body), {'order_id': 'A1'})
+        [histogram] = metrics.snapshot()['histograms']
+        self.assertEqual(histogram['name'], 'bonat_call_seconds')
+        self.assertEqual(histogram['labels'], {'endpoint': 'order', 'status': '200'})
+
+    def test_server_errors_open_circuit(self):
+        for _i in range(bonat_client.CIRCUIT_FAILURE_THRESHOLD):
+            self.stub.queue_response(503)
+            self.assertEqual(self.client.post('order', {}).status_code, 503)
+        with self.assertRaises(bonat_client.BonatUnavailable):
+            self.client.post('order', {})
+        self.assertEqual(self.stub.requests['order'], bonat_client.CIRCUIT_FAILURE_THRESHOLD,
+                         "no request is sent while the circuit is open")
+
+    def test_client_errors_keep_circuit_closed(self):
+        for _i in range(bonat_client.CIRCUIT_FAILURE_THRESHOLD):
+            self.stub.queue_response(400)
+            self.client.post('order', {})
+        self.assertTrue(self.client.breaker.allow())
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.pos_bonat_loyalty.cache import TTLCache
+from odoo.tests import BaseCase
+
+
+class TestTTLCache(BaseCase):
+
+    def test_get_set(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('a', 'default'), 'default')
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_expiry(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set('a', 1, ttl=-1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0, "an expired entry is dropped when read")
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'), "the least recently used entry is evicted")
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_pop_matching(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set(('db1', 1), 'x')
+        cache.set(('db1', 2), 'y')
+        cache.set(('db2', 1), 'z')
+        cache.pop_matching(lambda key: key[0] == 'db1')
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.pop(('db2', 1)), 'z')
+        self.assertEqual(len(cache), 0)
+
+    def test_stats(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        self.assertEqual(cache.stats()['hit_rate'], 0.0)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+        cache.get('a')
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['maxsize'], stats['hits'], stats['misses']), (1, 10, 2, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+
+    def test_max_bytes(self):
+        cache = TTLCache(maxsize=10, ttl=60, maxbytes=100)
+        cache.set('a', 'x', size=60)
+        cache.set('b', 'y', size=30)
+        self.assertEqual(cache.stats()['bytes'], 90)
+        cache.set('c', 'z', size=30)
+        self.assertIsNone(cache.get('a'), "the oldest entries are evicted beyond maxbytes")
+        self.assertEqual(cache.stats()['bytes'], 60)
+        cache.set('b', 'y', size=10)
+        self.assertEqual(cache.stats()['bytes'], 40, "replacing an entry replaces its size")
+        cache.pop('b')
+        self.assertEqual(cache.stats()['bytes'], 30)
+
+    def test_resize(self):
+        cache = TTLCache(maxsize=10, ttl=60, maxbytes=100)
+        cache.set('a', 'x', size=40)
+        cache.set('b', 'y', size=40)
+        cache.resize('b', 70)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 'y')
+        self.assertEqual(cache.stats()['bytes'], 70)
+        cache.resize('a', 10)
+        self.assertEqual(cache.stats()['bytes'], 70, "resizing an evicted entry does nothing")
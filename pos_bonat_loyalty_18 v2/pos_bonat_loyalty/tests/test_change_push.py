@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import hmac
+import json
+
+from odoo.addons.pos_bonat_loyalty import bonat_client, metrics
+from odoo.addons.pos_bonat_loyalty.benchmark.stub_server import BonatStubServer
+from odoo.addons.pos_bonat_loyalty.models.bonat_outbox import WEBHOOK_SECRET_PARAM, WEBHOOK_URL_PARAM
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestChangePush(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = BonatStubServer().start()
+        cls.addClassCleanup(cls.stub.stop)
+        cls.ICP = cls.env['ir.config_parameter'].sudo()
+        cls.ICP.set_param('pos_bonat_loyalty.api_url', cls.stub.url + '/odoo_partner')
+        cls.ICP.set_param(WEBHOOK_URL_PARAM, cls.stub.url + '/hook')
+        cls.ICP.set_param(WEBHOOK_SECRET_PARAM, 's3cr3t')
+        cls.company = cls.env.company
+        cls.company.write({
+            'enable_bonat_integration': True,
+            'bonat_api_key': 'test-key',
+            'bonat_merchant_id': 'TEST',
+        })
+        cls.Change = cls.env['bonat.change']
+        cls.product = cls.env['product.product'].create({'name': 'Test Push', 'available_in_pos': True})
+
+    def setUp(self):
+        super().setUp()
+        self.stub.reset()
+        bonat_client._breakers.clear()
+        self.addCleanup(bonat_client._breakers.clear)
+        # start from the changes of this test only
+        self.env.cr.flush()
+        self.Change.search([]).unlink()
+
+    def _get_changes(self, records):
+        # run the precommit hook writing the changes
+        self.env.cr.flush()
+        return self.Change.search([('res_model', '=', records._name), ('res_id', 'in', records.ids)])
+
+    def test_changes_coalesced(self):
+        self.product.name = 'Test Push 2'
+        self.product.lst_price = 20
+        self.assertEqual(len(self._get_changes(self.product)), 1)
+        self.product.name = 'Test Push 3'
+        self.assertEqual(len(self._get_changes(self.product)), 1, "a pending change is updated, not duplicated")
+
+    def test_template_changes(self):
+        self.product.product_tmpl_id.name = 'Test Template'
+        self.assertEqual(len(self._get_changes(self.product)), 1, "template changes are changes of its variants")
+        variant = self.product
+        self.Change.search([]).unlink()
+        variant.product_tmpl_id.unlink()
+        self.assertEqual(len(self._get_changes(variant)), 1, "variants deleted with their template are reported")
+
+    def test_disabled_without_webhook(self):
+        self.ICP.set_param(WEBHOOK_URL_PARAM, False)
+        self.product.name = 'Test Push 2'
+        self.assertFalse(self._get_changes(self.product))
+
+    def test_dispatch(self):
+        deleted = self.env['product.product'].create({'name': 'Test Deleted'})
+        deleted_id = deleted.id
+        self.product.name = 'Test Push 2'
+        deleted.unlink()
+        self.env.cr.flush()
+        self.Change._cron_dispatch_changes()
+        self.assertFalse(self.Change.search([]), "dispatched changes are removed")
+        message = self.env['bonat.outbox'].search([('kind', '=', 'change')], order='id desc', limit=1)
+        self.assertEqual(message.company_id, self.company)
+        payload = message.payload
+        self.assertEqual(payload['merchant_id'], 'TEST')
+        self.assertIn(self.product.id, [change['id'] for change in payload['changes']['product.product']])
+        self.assertEqual(payload['removed']['product.product'], [deleted_id])
+
+        message._deliver()
+        self.assertEqual(message.state, 'done')
+        [(endpoint, headers, body)] = self.stub.received
+        self.assertEqual(endpoint, 'hook')
+        self.assertNotIn('Authorization', headers, "the Bonat API key is never sent to the webhook")
+        self.assertEqual(json.loads(body)['merchant_id'], 'TEST')
+
+    def test_change_without_webhook_fails(self):
+        message = self.env['bonat.outbox']._enqueue('change', {'changes': {}}, self.company)
+        self.ICP.set_param(WEBHOOK_URL_PARAM, False)
+        message._deliver()
+        self.assertEqual(message.state, 'failed')
+        self.assertEqual(self.stub.received, [])
+
+
+@tagged('post_install', '-at_install')
+class TestWebhookClient(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = BonatStubServer().start()
+        cls.addClassCleanup(cls.stub.stop)
+
+    def setUp(self):
+        super().setUp()
+        bonat_client._breakers.clear()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_signed_without_api_key(self):
+        api_client = bonat_client.BonatClient('test-key', base_url=self.stub.url + '/odoo_partner')
+        webhook = bonat_client.WebhookClient(self.stub.url + '/hook', secret='s3cr3t')
+        self.assertIsNot(webhook.breaker, api_client.breaker, "the webhook has a circuit breaker of its own")
+        webhook.post('', {'changes': []}, headers={'Idempotency-Key': 'key-1'})
+        endpoint, headers, body = self.stub.received[0]
+        self.assertEqual(endpoint, 'hook')
+        self.assertNotIn('Authorization', headers)
+        signature = hmac.new(b's3cr3t', body, hashlib.sha256).hexdigest()
+        self.assertEqual(headers['X-Bonat-Signature'], 'sha256=%s' % signature)
+        [histogram] = metrics.snapshot()['histograms']
+        self.assertEqual(histogram['labels'], {'endpoint': 'webhook', 'status': '200'})
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import tagged
+from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT
+
+
+@tagged('post_install', '-at_install')
+class TestDeltaSync(BonatApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # write_date is the start of the test transaction
+        cls.since = (cls.env.cr.now() - timedelta(seconds=1)).strftime(DEFAULT_SERVER_DATETIME_FORMAT)
+        cls.products = cls.env['product.product'].create([
+            {'name': 'Test Delta %d' % i, 'available_in_pos': True} for i in range(4)
+        ])
+
+    def _get_delta(self, since):
+        response = self.api_get('/api/pos/products?fields=name&since=%s' % since)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_changed_records(self):
+        delta = self._get_delta(self.since)
+        self.assertLessEqual(set(self.products.ids), {row['id'] for row in delta['data']})
+        self.assertFalse(set(self.products.ids) & set(delta['removed']))
+
+    def test_removed_records(self):
+        archived, hidden, deleted, template_deleted = self.products
+        ids = self.products.ids
+        archived.active = False
+        hidden.available_in_pos = False
+        deleted.unlink()
+        template_deleted.product_tmpl_id.unlink()
+        delta = self._get_delta(self.since)
+        self.assertLessEqual(set(ids), set(delta['removed']),
+                             "archived, hidden and deleted products are removed, also through their template")
+        self.assertFalse(set(ids) & {row['id'] for row in delta['data']})
+
+    def test_watermark_covers_open_transactions(self):
+        watermark = self._get_delta(self.since)['watermark']
+        self.assertLessEqual(datetime.strptime(watermark, DEFAULT_SERVER_DATETIME_FORMAT), self.env.cr.now())
+        # the rows of the test transaction, still open, are in the next delta
+        delta = self._get_delta(watermark)
+        self.assertLessEqual(set(self.products.ids), {row['id'] for row in delta['data']})
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import gzip
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.addons.pos_bonat_loyalty import const
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestExport(BonatApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['pos.category'].create([{'name': 'Test Export %s' % i} for i in range(3)])
+        cls.category_ids = cls.env['pos.category'].search([], order='id').ids
+        cls.Export = cls.env['bonat.export']
+        cls.cron = cls.env.ref('pos_bonat_loyalty.ir_cron_bonat_export')
+
+    def _enqueue(self):
+        export = self.Export._enqueue('categories', self.api_user, 'http://localhost')
+        self.addCleanup(export._remove_partial_file)
+        return export
+
+    def _read_snapshot(self, export):
+        lines = gzip.decompress(export.attachment_id.raw).splitlines()
+        return [json.loads(line)['id'] for line in lines]
+
+    def test_export_run(self):
+        response = self.api_get('/api/pos/exports', data={'resource': 'categories'})
+        self.assertEqual(response.status_code, 200)
+        status = response.json()
+        self.assertEqual(status['state'], 'queued')
+        self.assertIsNone(status['download_url'])
+
+        self.Export._cron_run_exports()
+        status = self.api_get('/api/pos/exports/%s' % status['id']).json()
+        self.assertEqual(status['state'], 'done')
+        self.assertEqual(status['record_count'], len(self.category_ids))
+        self.assertIn('/web/content/', status['download_url'])
+        export = self.Export.browse(status['id'])
+        self.assertEqual(self._read_snapshot(export), self.category_ids)
+
+    def test_export_resumed(self):
+        export = self._enqueue()
+        with patch.object(const, 'api_stream_batch_size', 1):
+            export.state = 'running'
+            self.assertFalse(export._run(deadline=0, auto_commit=False), "one batch per run past the deadline")
+        self.assertEqual(export.last_id, self.category_ids[0])
+        self.assertEqual(export.record_count, 1)
+        # what an interrupted run wrote after the checkpoint is dropped
+        with open(export._get_partial_path(), 'ab') as fileobj:
+            fileobj.write(b'garbage')
+
+        export.state = 'queued'
+        self.Export._cron_run_exports()
+        self.assertEqual(export.state, 'done')
+        self.assertEqual(export.record_count, len(self.category_ids))
+        self.assertEqual(self._read_snapshot(export), self.category_ids, "resumed from the checkpoint, no duplicate")
+
+    def test_time_budget(self):
+        export = self._enqueue()
+        triggers = self.env['ir.cron.trigger'].search_count([('cron_id', '=', self.cron.id)])
+        with patch.object(const, 'export_time_budget', 0):
+            self.Export._cron_run_exports()
+        self.assertEqual(export.state, 'queued')
+        self.assertGreater(self.env['ir.cron.trigger'].search_count([('cron_id', '=', self.cron.id)]), triggers,
+                           "the next run is triggered to continue")
+
+    def test_stale_exports(self):
+        export = self._enqueue()
+        started = fields.Datetime.now() - timedelta(seconds=2 * const.export_stale_after)
+        export.write({'state': 'running', 'date_started': started})
+        self.Export._recover_stale_exports()
+        self.assertEqual(export.state, 'queued')
+        self.assertEqual(export.attempt_count, 1)
+
+        export.write({'state': 'running', 'attempt_count': const.export_max_attempts})
+        self.Export._recover_stale_exports()
+        self.assertEqual(export.state, 'failed')
+        self.assertTrue(export.error)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from odoo.addons.pos_bonat_loyalty import const
+from odoo.addons.pos_bonat_loyalty.controllers.main import POSBonatAPIs
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatPosApiCase
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestFilters(BonatPosApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.other_config, cls.other_session = cls.create_session('Test Other POS')
+        cls.order_may = cls.create_order(datetime(2024, 5, 10, 12, 0))
+        cls.order_june = cls.create_order(datetime(2024, 6, 10, 12, 0))
+        cls.order_other = cls.create_order(datetime(2024, 5, 10, 12, 0), session=cls.other_session)
+        cls.order_draft = cls.create_order(datetime(2024, 5, 10, 12, 0), state='draft')
+
+    def _get_ids(self, path):
+        response = self.api_get(path)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()]
+
+    def test_filter_domain(self):
+        domain = POSBonatAPIs()._get_filter_domain(self.env, 'pos.order', {
+            'date_from': '2024-05-01T00:00:00+03:00',
+            'session_id': '1,2',
+            'state': 'paid,done',
+            'pos_reference': 'Order 0001',
+            'partner_id': '',
+        }, const.pos_order_filters)
+        self.assertEqual(domain, [
+            ('date_order', '>=', datetime(2024, 4, 30, 21, 0)),
+            ('session_id', 'in', [1, 2]),
+            ('state', 'in', ['paid', 'done']),
+            ('pos_reference', '=', 'Order 0001'),
+        ])
+
+    def test_orders(self):
+        path = '/api/pos/orders?fields=name&config_id=%s' % self.pos_config.id
+        self.assertEqual(self._get_ids(path), [self.order_june.id, self.order_draft.id, self.order_may.id],
+                         "orders come newest first")
+        self.assertEqual(self._get_ids(path + '&state=paid&date_from=2024-05-01&date_to=2024-06-01'), [self.order_may.id])
+        self.assertEqual(self._get_ids('/api/pos/orders?fields=name&session_id=%s' % self.other_session.id),
+                         [self.order_other.id])
+
+    def test_sessions(self):
+        path = '/api/pos/sessions?fields=name&config_id=%s,%s&state=opened' % (self.pos_config.id, self.other_config.id)
+        self.assertEqual(self._get_ids(path), [self.other_session.id, self.pos_session.id])
+
+    def test_invalid_filters(self):
+        for path in (
+            '/api/pos/orders?state=unknown_state',
+            '/api/pos/orders?session_id=abc',
+            '/api/pos/orders?date_from=yesterday',
+            '/api/pos/sessions?config_id=1,x',
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.api_get(path).status_code, 400)
+
+    def test_indexes(self):
+        self.env.cr.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'pos_order' AND indexname LIKE %s",
+                            ['pos_order_bonat_%'])
+        self.assertEqual({row[0] for row in self.env.cr.fetchall()},
+                         {'pos_order_bonat_config_date_order_index', 'pos_order_bonat_pos_reference_index'})
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import os
+import time
+from datetime import timedelta
+
+from PIL import Image
+
+from odoo.addons.pos_bonat_loyalty import const, serializer
+from odoo.tests import HttpCase, tagged
+
+
+def make_image(size, color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (size, size), color).save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue())
+
+
+@tagged('post_install', '-at_install')
+class TestApiImage(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.product = cls.env['product.product'].create({
+            'name': 'Test Image',
+            'available_in_pos': True,
+            'image_1920': make_image(600),
+        })
+        cls.category = cls.env['pos.category'].create({'name': 'Test Image', 'image_128': make_image(100)})
+
+    def _image_size(self, response):
+        return Image.open(io.BytesIO(response.content)).size
+
+    def test_stored_variant(self):
+        response = self.url_open('/api/image/product.product/%s/image_1920?size=256' % self.product.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._image_size(response), (256, 256))
+
+    def test_resized_and_cached(self):
+        path = '/api/image/pos.category/%s/image_128?size=256' % self.category.id
+        response = self.url_open(path)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertTrue(etag.strip('"').endswith('-256'))
+        cache_dir = self.env['ir.binary']._get_bonat_image_cache_dir()
+        cached = os.path.join(cache_dir, etag.strip('"')[:2], etag.strip('"'))
+        self.assertTrue(os.path.exists(cached))
+        self.assertEqual(self.url_open(path).headers['ETag'], etag)
+
+    def test_not_modified(self):
+        path = '/api/image/product.product/%s/image_1920?size=128' % self.product.id
+        etag = self.url_open(path).headers['ETag']
+        response = self.url_open(path, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_cache_control(self):
+        path = '/api/image/product.product/%s/image_1920' % self.product.id
+        self.assertNotIn('immutable', self.url_open(path).headers['Cache-Control'])
+        response = self.url_open(path + '?unique=20240101000000')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+
+    def test_size_restricted_to_api_images(self):
+        partner = self.env['res.partner'].create({'name': 'Test Image', 'image_1920': make_image(600)})
+        attachment = self.env['ir.attachment'].create({'name': 'test.png', 'datas': make_image(600)})
+        for path in (
+            '/api/image/res.partner/%s/image_1920?size=128' % partner.id,
+            '/api/image/ir.attachment/%s/raw?size=128' % attachment.id,
+            '/api/image/product.product/%s/image_1920?size=100' % self.product.id,
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.url_open(path).status_code, 400)
+
+    def test_gc_image_cache(self):
+        cache_dir = os.path.join(self.env['ir.binary']._get_bonat_image_cache_dir(), 'zz')
+        os.makedirs(cache_dir, exist_ok=True)
+        old_path, new_path = os.path.join(cache_dir, 'zz-old-128'), os.path.join(cache_dir, 'zz-new-128')
+        for path in (old_path, new_path):
+            with open(path, 'wb') as fd:
+                fd.write(b'image')
+            self.addCleanup(lambda path=path: os.path.exists(path) and os.unlink(path))
+        old_time = time.time() - (const.api_image_cache_keep_days + 1) * 86400
+        os.utime(old_path, (old_time, old_time))
+        self.env['ir.binary']._gc_bonat_image_cache()
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(new_path))
+
+    def test_unique_follows_template_image(self):
+        def get_url():
+            self.env.invalidate_all()
+            rows = self.env['product.product'].with_context(bin_size=True).search_read(
+                [('id', '=', self.product.id)], ['image_1920'])
+            return serializer.serialize_records(self.env, 'product.product', rows, base_url='http://localhost')[0]['image_1920']
+
+        url = get_url()
+        self.assertIn('?unique=', url)
+        # the variant image falls back on the template one, changed later
+        template = self.product.product_tmpl_id
+        template.flush_recordset()
+        self.env.cr.execute("UPDATE product_template SET write_date = %s WHERE id = %s",
+                            [template.write_date + timedelta(hours=1), template.id])
+        self.assertNotEqual(get_url(), url)
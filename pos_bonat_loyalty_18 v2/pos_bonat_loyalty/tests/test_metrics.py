@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import os
+
+from odoo.addons.pos_bonat_loyalty import metrics
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import BaseCase, tagged
+
+
+class TestMetrics(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_histogram(self):
+        histogram = metrics.Histogram((1, 10))
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+        data = histogram.to_dict()
+        self.assertEqual((data['count'], data['sum'], data['max'], data['avg']), (4, 56.5, 50, 14.125))
+        self.assertEqual(data['buckets'], [
+            {'le': 1, 'count': 2},
+            {'le': 10, 'count': 3},
+            {'le': '+Inf', 'count': 4},
+        ], "buckets are cumulative and their bounds inclusive")
+
+    def test_observe_snapshot(self):
+        metrics.observe('call_seconds', 0.2, endpoint='order', status='200')
+        metrics.observe('call_seconds', 0.4, status='200', endpoint='order')
+        metrics.observe('call_seconds', 1, endpoint='redeem', status='503')
+        data = metrics.snapshot()
+        self.assertEqual(data['pid'], os.getpid())
+        histograms = {tuple(sorted(h['labels'].items())): h for h in data['histograms']}
+        self.assertEqual(len(histograms), 2, "labels are grouped whatever their order")
+        order = histograms[(('endpoint', 'order'), ('status', '200'))]
+        self.assertEqual(order['name'], 'call_seconds')
+        self.assertEqual(order['count'], 2)
+        self.assertAlmostEqual(order['sum'], 0.6)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['histograms'], [])
+
+    def test_request_stats(self):
+        metrics.add_request_stat('rows', 10)
+        with metrics.request_stats() as stats:
+            metrics.add_request_stat('rows', 10)
+            metrics.add_request_stat('rows', 5)
+        self.assertEqual(stats, {'rows': 15}, "stats are only collected within request_stats")
+        metrics.add_request_stat('rows', 1)
+        self.assertEqual(stats, {'rows': 15})
+
+
+@tagged('post_install', '-at_install')
+class TestMetricsRoute(BonatApiCase):
+
+    def test_metrics(self):
+        self.api_get('/api/pos/categories?fields=name')
+        response = self.api_get('/api/pos/metrics')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data['caches']), {'api_keys', 'responses', 'reward_checks'})
+        self.assertIn('categories', {h['labels'].get('route') for h in data['histograms']})
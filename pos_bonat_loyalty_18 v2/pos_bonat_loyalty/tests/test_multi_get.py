@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.addons.pos_bonat_loyalty import const
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestMultiGet(BonatApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first, cls.second = cls.env['pos.category'].create([{'name': 'Test First'}, {'name': 'Test Second'}])
+        cls.missing_id = cls.second.id + 1000000
+
+    def test_ids_in_query(self):
+        response = self.api_get('/api/pos/categories?fields=name&ids=%s,%s,%s,%s' % (
+            self.second.id, self.missing_id, self.first.id, self.second.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'data': [
+                {'id': self.second.id, 'name': 'Test Second'},
+                {'id': self.first.id, 'name': 'Test First'},
+            ],
+            'missing': [self.missing_id],
+        }, "records come in the order of ids, without duplicates")
+
+    def test_ids_in_body(self):
+        response = self.api_get('/api/pos/categories?fields=name', data=json.dumps({'ids': [self.first.id, self.missing_id]}),
+                                headers={'Content-Type': 'application/json'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'data': [{'id': self.first.id, 'name': 'Test First'}], 'missing': [self.missing_id]})
+
+    def test_domain_applies(self):
+        product = self.env['product.product'].create({'name': 'Test Hidden', 'available_in_pos': False})
+        response = self.api_get('/api/pos/products?fields=name&ids=%s' % product.id)
+        self.assertEqual(response.json(), {'data': [], 'missing': [product.id]}, "ids outside the route domain are missing")
+
+    def test_invalid_ids(self):
+        too_many = ','.join(str(i) for i in range(1, const.api_max_page_size + 2))
+        for path, kwargs in (
+            ('/api/pos/categories?ids=1,abc', {}),
+            ('/api/pos/categories?ids=%s' % too_many, {}),
+            ('/api/pos/categories', {'data': json.dumps({'ids': 'abc'}), 'headers': {'Content-Type': 'application/json'}}),
+            ('/api/pos/categories', {'data': '[1, 2]', 'headers': {'Content-Type': 'application/json'}}),
+            ('/api/pos/categories', {'data': json.dumps({})}),
+        ):
+            with self.subTest(path=path, **kwargs):
+                self.assertEqual(self.api_get(path, **kwargs).status_code, 400)
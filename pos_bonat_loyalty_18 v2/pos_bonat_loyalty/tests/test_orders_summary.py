@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from odoo.addons.pos_bonat_loyalty.controllers.main import POSBonatAPIs
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatPosApiCase
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestOrdersSummary(BonatPosApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # UTC+3: the local day of May 1st runs from April 30th 21:00 UTC
+        cls.api_user.tz = 'Asia/Riyadh'
+        cls.create_order(datetime(2024, 4, 30, 22, 0), price_unit=10)
+        cls.create_order(datetime(2024, 5, 1, 12, 0), price_unit=20, qty=2)
+        cls.create_order(datetime(2024, 5, 1, 22, 0), price_unit=5)
+        cls.create_order(datetime(2024, 5, 1, 12, 0), price_unit=100, state='draft')
+
+    def _get_summary(self, query):
+        response = self.api_get('/api/pos/orders/summary?config_id=%s&%s' % (self.pos_config.id, query))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_day_buckets_in_user_timezone(self):
+        summary = self._get_summary('date_from=2024-05-01&date_to=2024-05-02')
+        self.assertEqual(summary['orders'], [{
+            'date': '2024-05-01',
+            'config_id': self.pos_config.id,
+            'order_count': 2,
+            'amount_total': 50.0,
+            'amount_tax': 0.0,
+            'amount_paid': 50.0,
+        }], "the range and the bucket are the same local day, draft orders excluded")
+        self.assertEqual(summary['products'], [{
+            'date': '2024-05-01',
+            'config_id': self.pos_config.id,
+            'product_id': self.pos_product.id,
+            'line_count': 2,
+            'qty': 3.0,
+            'price_subtotal': 50.0,
+            'price_subtotal_incl': 50.0,
+        }])
+
+    def test_groupby_and_interval(self):
+        summary = self._get_summary('groupby=config')
+        self.assertEqual([(row['config_id'], row['order_count'], row['amount_total']) for row in summary['orders']],
+                         [(self.pos_config.id, 3, 55.0)])
+        summary = self._get_summary('interval=month')
+        self.assertEqual([(row['date'], row['order_count']) for row in summary['orders']], [('2024-05-01', 3)])
+        summary = self._get_summary('state=draft&groupby=')
+        self.assertEqual([(row['order_count'], row['amount_total']) for row in summary['orders']], [(1, 100.0)])
+
+    def test_naive_dates_in_timezone(self):
+        controller = POSBonatAPIs()
+        kw = {'date_from': '2024-05-01', 'date_to': '2024-05-02T00:00:00Z'}
+        self.assertEqual(controller._get_datetime_param(kw, 'date_from', tz='Asia/Riyadh'), datetime(2024, 4, 30, 21, 0))
+        self.assertEqual(controller._get_datetime_param(kw, 'date_from'), datetime(2024, 5, 1, 0, 0))
+        self.assertEqual(controller._get_datetime_param(kw, 'date_to', tz='Asia/Riyadh'), datetime(2024, 5, 2, 0, 0),
+                         "explicit offsets are kept")
+
+    def test_invalid_parameters(self):
+        for query in ('interval=hour', 'groupby=partner', 'date_from=yesterday'):
+            with self.subTest(query=query):
+                self.assertEqual(self.api_get('/api/pos/orders/summary?%s' % query).status_code, 400)
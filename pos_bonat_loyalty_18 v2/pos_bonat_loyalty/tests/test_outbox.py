@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.addons.pos_bonat_loyalty import bonat_client
+from odoo.addons.pos_bonat_loyalty.benchmark.stub_server import BonatStubServer
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestBonatOutbox(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = BonatStubServer().start()
+        cls.addClassCleanup(cls.stub.stop)
+        cls.ICP = cls.env['ir.config_parameter'].sudo()
+        cls.ICP.set_param('pos_bonat_loyalty.api_url', cls.stub.url + '/odoo_partner')
+        cls.company = cls.env.company
+        cls.company.write({
+            'enable_bonat_integration': True,
+            'bonat_api_key': 'test-key',
+            'bonat_merchant_id': 'TEST',
+        })
+        cls.Outbox = cls.env['bonat.outbox']
+
+    def setUp(self):
+        super().setUp()
+        self.stub.reset()
+        bonat_client._breakers.clear()
+        self.addCleanup(bonat_client._breakers.clear)
+
+    def _enqueue(self, kind='order', payload=None, idempotency_key=None):
+        return self.Outbox._enqueue(kind, payload or {'order_id': 'A1'}, self.company, idempotency_key=idempotency_key)
+
+    def test_delivered(self):
+        message = self._enqueue(idempotency_key='order-1')
+        message._deliver()
+        self.assertRecordValues(message, [{'state': 'done', 'attempt_count': 1, 'response_data': {'id': 'A1'}, 'last_error': False}])
+        [(endpoint, headers, _body)] = self.stub.received
+        self.assertEqual(endpoint, 'order')
+        self.assertEqual(headers['Idempotency-Key'], 'order-1')
+
+    def test_retryable_status(self):
+        message = self._enqueue()
+        self.stub.queue_response(503)
+        message._deliver()
+        self.assertEqual(message.state, 'pending')
+        self.assertEqual(message.attempt_count, 1)
+        self.assertGreater(message.next_attempt_date, fields.Datetime.now())
+        self.assertIn('503', message.last_error)
+
+        self.stub.queue_response(429)
+        message._deliver()
+        self.assertEqual((message.state, message.attempt_count), ('pending', 2))
+
+    def test_final_status(self):
+        message = self._enqueue()
+        self.stub.queue_response(400)
+        message._deliver()
+        self.assertEqual((message.state, message.attempt_count), ('failed', 1))
+        self.assertIn('400', message.last_error)
+
+    def test_error_code(self):
+        message = self._enqueue()
+        self.stub.queue_response(200, {'code': 1, 'errors': 'Order already exists'})
+        message._deliver()
+        self.assertRecordValues(message, [{'state': 'failed', 'attempt_count': 1, 'last_error': 'Order already exists'}])
+
+    def test_max_attempts(self):
+        self.ICP.set_param('pos_bonat_loyalty.outbox_max_attempts', 2)
+        message = self._enqueue()
+        self.stub.queue_response(503)
+        self.stub.queue_response(503)
+        message._deliver()
+        self.assertEqual((message.state, message.attempt_count), ('pending', 1))
+        message._deliver()
+        self.assertEqual((message.state, message.attempt_count), ('failed', 2))
+
+    def test_network_error(self):
+        self.ICP.set_param('pos_bonat_loyalty.api_url', 'http://127.0.0.1:1/odoo_partner')
+        message = self._enqueue()
+        message._deliver()
+        self.assertEqual((message.state, message.attempt_count), ('pending', 1))
+        self.assertTrue(message.last_error.startswith('Request error'))
+
+    def test_open_circuit_keeps_attempt(self):
+        message = self._enqueue()
+        breaker = bonat_client.get_circuit_breaker(self.company._get_bonat_client().base_url)
+        for _i in range(breaker.failure_threshold):
+            breaker.record_failure()
+        message._deliver()
+        self.assertEqual(self.stub.received, [], "nothing is sent while the circuit is open")
+        self.assertEqual((message.state, message.attempt_count), ('pending', 0))
+        self.assertGreater(message.next_attempt_date, fields.Datetime.now())
+
+    def test_duplicate_idempotency_key(self):
+        message = self._enqueue(payload={'order_id': 'A1'}, idempotency_key='order-1')
+        duplicate = self._enqueue(payload={'order_id': 'A2'}, idempotency_key='order-1')
+        self.assertEqual(duplicate, message)
+        self.assertEqual(message.payload, {'order_id': 'A1'})
+        self.assertEqual(self.Outbox.search_count([('idempotency_key', '=', 'order-1')]), 1)
+        self.assertNotEqual(self._enqueue(kind='redeem', idempotency_key='order-1'), message,
+                            "keys are unique per kind")
+
+    def test_record_delivered(self):
+        key = self.Outbox._get_redeem_key('TEST', 'CODE1')
+        self.assertFalse(self.Outbox._is_redeemed('TEST', 'CODE1'))
+        message = self.Outbox._record_delivered('redeem', {'reward_code': 'CODE1'}, self.company, key)
+        self.assertTrue(self.Outbox._is_redeemed('TEST', 'CODE1'))
+        self.assertEqual(self._enqueue(kind='redeem', idempotency_key=key), message)
+        self.assertEqual(message.state, 'done')
+
+    def test_integration_disabled(self):
+        message = self._enqueue()
+        self.company.enable_bonat_integration = False
+        message._deliver()
+        self.assertEqual(message.state, 'failed')
+        self.assertEqual(self.stub.received, [])
+
+    def test_cron_delivers_due_messages(self):
+        due = self._enqueue()
+        later = self._enqueue()
+        later.next_attempt_date = fields.Datetime.now() + timedelta(hours=1)
+        self.Outbox._cron_process_outbox()
+        self.assertEqual(due.state, 'done')
+        self.assertEqual(later.state, 'pending')
+        self.assertEqual(len(self.stub.received), 1)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestPagination(BonatApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.categories = cls.env['pos.category'].create([{'name': 'Test Category %d' % i} for i in range(3)])
+
+    def test_keyset_pages(self):
+        after_id = self.categories[0].id - 1
+        pages = []
+        while after_id:
+            response = self.api_get('/api/pos/categories?fields=name&limit=2&after_id=%s' % after_id)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            pages.append([row['id'] for row in page['data']])
+            after_id = page['next']
+        ids = self.categories.ids
+        self.assertEqual(pages, [ids[:2], ids[2:]])
+
+    def test_without_paging(self):
+        data = self.api_get('/api/pos/categories?fields=name').json()
+        self.assertIsInstance(data, list, "without paging parameters the whole list is returned")
+        self.assertLessEqual(set(self.categories.ids), {row['id'] for row in data})
+
+    def test_stream(self):
+        response = self.api_get('/api/pos/categories?fields=name&stream=1&after_id=%s' % (self.categories[0].id - 1))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in response.content.splitlines()]
+        self.assertEqual(rows, [{'id': category.id, 'name': category.name} for category in self.categories])
+
+    def test_invalid_paging(self):
+        for path in ('/api/pos/categories?limit=-1', '/api/pos/categories?after_id=abc'):
+            with self.subTest(path=path):
+                self.assertEqual(self.api_get(path).status_code, 400)
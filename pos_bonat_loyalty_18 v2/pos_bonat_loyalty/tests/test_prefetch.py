@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.pos_bonat_loyalty import const, serializer
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRelationPrefetch(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.categories = cls.env['pos.category'].create([{'name': 'Test Category %d' % i} for i in range(3)])
+        cls.tags = cls.env['product.tag'].create([{'name': 'Test Tag %d' % i} for i in range(2)])
+        cls.products = cls.env['product.product'].create([{
+            'name': 'Test Product %d' % i,
+            'available_in_pos': True,
+            'pos_categ_ids': [(6, 0, cls.categories[i % 3].ids)],
+            'product_tag_ids': [(6, 0, cls.tags[i % 2].ids)],
+        } for i in range(30)])
+
+    def _serialize(self, products):
+        """Rows of the products export for ``products`` and the number of
+        queries their serialization took."""
+        rows = products.with_context(bin_size=True).search_read(
+            [('id', 'in', products.ids)], const.product_fields, order='id')
+        self.env.invalidate_all()
+        query_count = self.env.cr.sql_log_count
+        data = serializer.serialize_records(
+            self.env, 'product.product', rows, base_url='http://localhost',
+            m2o_fields=const.product_m2o_fields, m2m_fields=const.product_m2m_fields)
+        return data, self.env.cr.sql_log_count - query_count
+
+    def test_query_count_independent_of_rows(self):
+        _data, small_count = self._serialize(self.products[:6])
+        data, large_count = self._serialize(self.products)
+        self.assertEqual(large_count, small_count, "relations are read once for all the rows")
+        self.assertEqual(len(data), 30)
+
+    def test_relations_expanded(self):
+        data, _query_count = self._serialize(self.products[:2])
+        product = data[0]
+        self.assertEqual(product['categ_id']['id'], self.products[0].categ_id.id)
+        self.assertEqual(set(product['categ_id']), {'id', 'name', 'parent_id'})
+        self.assertEqual([categ['name'] for categ in product['pos_categ_ids']], ['Test Category 0'])
+        self.assertEqual([tag['name'] for tag in data[1]['product_tag_ids']], ['Test Tag 1'])
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestProjection(BonatApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.parent = cls.env['pos.category'].create({'name': 'Test Drinks'})
+        cls.child = cls.env['pos.category'].create({'name': 'Test Juices', 'parent_id': cls.parent.id})
+        cls.tag = cls.env['product.tag'].create({'name': 'Test Tag'})
+        cls.product = cls.env['product.product'].create({
+            'name': 'Test Projection',
+            'available_in_pos': True,
+            'product_tag_ids': [(6, 0, cls.tag.ids)],
+            'pos_categ_ids': [(6, 0, cls.child.ids)],
+        })
+
+    def _get_product(self, query):
+        response = self.api_get('/api/pos/products/%s?%s' % (self.product.id, query))
+        self.assertEqual(response.status_code, 200)
+        [product] = response.json()
+        return product
+
+    def test_fields(self):
+        rows = self.api_get('/api/pos/categories?fields=name,parent_id').json()
+        child = next(row for row in rows if row['id'] == self.child.id)
+        self.assertEqual(child, {'id': self.child.id, 'name': 'Test Juices', 'parent_id': [self.parent.id, 'Test Drinks']})
+
+    def test_expand(self):
+        product = self._get_product('fields=name,product_tag_ids,pos_categ_ids')
+        self.assertEqual(product['product_tag_ids'], [{'id': self.tag.id, 'name': 'Test Tag'}],
+                         "relations are expanded by default")
+        product = self._get_product('fields=name,product_tag_ids,pos_categ_ids&expand=product_tag_ids')
+        self.assertEqual(product['product_tag_ids'], [{'id': self.tag.id, 'name': 'Test Tag'}])
+        self.assertEqual(product['pos_categ_ids'], self.child.ids, "relations not expanded are ids")
+
+    def test_expand_adds_field(self):
+        product = self._get_product('fields=name&expand=product_tag_ids')
+        self.assertEqual(set(product), {'id', 'name', 'product_tag_ids'})
+
+    def test_count(self):
+        product = self._get_product('fields=name,product_tag_ids&count=product_tag_ids')
+        self.assertEqual(product, {'id': self.product.id, 'name': 'Test Projection', 'product_tag_ids': 1})
+
+    def test_invalid_projection(self):
+        for query in ('fields=name,unknown_field', 'expand=name', 'count=name', 'fields=name&count=product_tag_ids'):
+            with self.subTest(query=query):
+                response = self.api_get('/api/pos/products?%s' % query)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.addons.pos_bonat_loyalty import const
+from odoo.addons.pos_bonat_loyalty.controllers import main
+from odoo.addons.pos_bonat_loyalty.tests.common import BonatApiCase
+from odoo.tests import tagged
+
+PATH = '/api/pos/categories?fields=name'
+
+
+@tagged('post_install', '-at_install')
+class TestResponseCache(BonatApiCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.category = cls.env['pos.category'].create({'name': 'Test Cached'})
+
+    def _names(self, response):
+        return {row['id']: row['name'] for row in response.json()}
+
+    def test_conditional_get(self):
+        response = self.api_get(PATH)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        response = self.api_get(PATH, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+        self.assertEqual(self.api_get(PATH, headers={'If-None-Match': 'W/"other"'}).status_code, 200)
+
+    def test_served_from_cache(self):
+        self.api_get(PATH)
+        hits = main._response_cache.stats()['hits']
+        self.assertEqual(self._names(self.api_get(PATH))[self.category.id], 'Test Cached')
+        self.assertEqual(main._response_cache.stats()['hits'], hits + 1)
+
+    def test_invalidated_on_write(self):
+        response = self.api_get(PATH)
+        etag = response.headers['ETag']
+        self.category.name = 'Test Renamed'
+        # run the precommit hooks bumping the cache version
+        self.env.cr.flush()
+        response = self.api_get(PATH, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(self._names(response)[self.category.id], 'Test Renamed')
+
+    def test_delta_not_stored(self):
+        response = self.api_get(PATH + '&since=2020-01-01T00:00:00')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(main._response_cache), 0)
+        response = self.api_get(PATH + '&since=2020-01-01T00:00:00', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304, "delta responses are still validated")
+
+    def test_large_body_not_stored(self):
+        with patch.object(const, 'response_cache_max_body', 10):
+            response = self.api_get(PATH)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response.headers)
+        self.assertEqual(len(main._response_cache), 0)
+
+    def test_compressed_copy_counted(self):
+        self.api_get(PATH, headers={'Accept-Encoding': 'identity'})
+        size = main._response_cache.stats()['bytes']
+        with patch.object(const, 'api_compress_min_size', 0):
+            response = self.api_get(PATH, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+        self.assertGreater(main._response_cache.stats()['bytes'], size)
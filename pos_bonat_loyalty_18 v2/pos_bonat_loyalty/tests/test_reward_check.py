@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.pos_bonat_loyalty import bonat_client
+from odoo.addons.pos_bonat_loyalty.benchmark.stub_server import BonatStubServer
+from odoo.addons.pos_bonat_loyalty.models import res_company
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRewardCheckCache(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = BonatStubServer().start()
+        cls.addClassCleanup(cls.stub.stop)
+        cls.env['ir.config_parameter'].sudo().set_param('pos_bonat_loyalty.api_url', cls.stub.url + '/odoo_partner')
+        cls.env.company.write({
+            'enable_bonat_integration': True,
+            'bonat_api_key': 'test-key',
+            'bonat_merchant_id': 'TEST',
+        })
+
+    def setUp(self):
+        super().setUp()
+        self.stub.reset()
+        bonat_client._breakers.clear()
+        res_company._reward_check_cache.clear()
+        self.addCleanup(res_company._reward_check_cache.clear)
+
+    def test_answer_cached(self):
+        Company = self.env['res.company']
+        first = Company.get_bonat_code_response('CODE1')
+        self.assertTrue(first['success'])
+        self.assertEqual(Company.get_bonat_code_response('CODE1'), first)
+        self.assertEqual(self.stub.requests['reward-check'], 1)
+        Company.get_bonat_code_response('CODE2')
+        self.assertEqual(self.stub.requests['reward-check'], 2, "answers are cached per code")
+
+    def test_errors_not_cached(self):
+        Company = self.env['res.company']
+        self.stub.queue_response(200, {'code': 1, 'errors': 'Unknown code'})
+        self.assertEqual(Company.get_bonat_code_response('CODE1'), {'success': False, 'error': 'Unknown code'})
+        self.assertTrue(Company.get_bonat_code_response('CODE1')['success'])
+        self.assertEqual(self.stub.requests['reward-check'], 2)
+
+    def test_redeemed_code_not_served(self):
+        Company = self.env['res.company']
+        Company.get_bonat_code_response('CODE1')
+        Outbox = self.env['bonat.outbox']
+        Outbox._record_delivered('redeem', {'reward_code': 'CODE1'}, self.env.company, Outbox._get_redeem_key('TEST', 'CODE1'))
+        Company.get_bonat_code_response('CODE1')
+        self.assertEqual(self.stub.requests['reward-check'], 2, "a redeemed code is checked again")
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import json
+from datetime import date, datetime
+
+from odoo.addons.pos_bonat_loyalty import serializer
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestSerializer(TransactionCase):
+
+    def test_plan_cached(self):
+        plan = serializer.get_plan(self.env, 'pos.category', ['id', 'name', 'write_date'])
+        self.assertIs(serializer.get_plan(self.env, 'pos.category', ['id', 'name', 'write_date']), plan)
+        self.assertIsNot(serializer.get_plan(self.env, 'pos.category', ['id', 'name']), plan)
+        self.assertEqual([field_name for field_name, _convert, _always in plan.converters], ['write_date'],
+                         "only the fields needing a conversion have a converter")
+
+    def test_plans_bounded(self):
+        for i in range(serializer.MAX_PLANS + 1):
+            serializer.get_plan(self.env, 'pos.category', ['id'] * (i + 1))
+        _registry, plans = serializer._plans[self.env.registry.db_name]
+        self.assertLessEqual(len(plans), serializer.MAX_PLANS)
+
+    def test_conversions(self):
+        parent = self.env['pos.category'].create({'name': 'Test Parent'})
+        rows = [{
+            'id': 7,
+            'name': 'Test',
+            'write_date': datetime(2024, 5, 1, 10, 30),
+            'parent_id': (parent.id, 'Test Parent'),
+            'child_ids': [],
+        }]
+        data = serializer.serialize_records(self.env, 'pos.category', rows, m2o_fields={'parent_id': ['name']},
+                                            count_fields={'child_ids'}, base_url='http://localhost')
+        self.assertEqual(data, [{
+            'id': 7,
+            'name': 'Test',
+            'write_date': '2024-05-01 10:30:00',
+            'parent_id': {'id': parent.id, 'name': 'Test Parent'},
+            'child_ids': 0,
+        }])
+        self.assertEqual(rows[0]['write_date'], datetime(2024, 5, 1, 10, 30), "rows are not modified")
+
+    def test_dumps(self):
+        data = {'name': 'é', 'values': [1, 2.5, None, True]}
+        self.assertEqual(json.loads(serializer.dumps(data)), data)
+        self.assertIsInstance(serializer.dumps(data), bytes)
+        self.assertEqual(serializer._convert_date(date(2024, 5, 1), {}, {}), '2024-05-01')